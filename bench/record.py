@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Record live YTMusic responses for the replay client.
+
+    python bench/record.py --songs kffacxfA7G4 --queries "lagu indonesia" \\
+        --artists UC... --playlists PL... --countries ID
+
+Needs network access and ytmusicapi. Responses are written to
+bench/recordings.json (or --out), merged into what is already there.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay import RECORDINGS_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--songs", nargs="*", default=[])
+    parser.add_argument("--queries", nargs="*", default=[])
+    parser.add_argument("--filter", default="songs")
+    parser.add_argument("--artists", nargs="*", default=[])
+    parser.add_argument("--playlists", nargs="*", default=[])
+    parser.add_argument("--countries", nargs="*", default=[])
+    parser.add_argument("--out", default=RECORDINGS_PATH)
+    args = parser.parse_args()
+
+    from ytmusicapi import YTMusic
+    ytmusic = YTMusic()
+
+    recordings = {}
+    if os.path.exists(args.out):
+        with open(args.out, "rb") as f:
+            recordings = json.loads(f.read())
+
+    def record(method, key, call):
+        print(f"📼 {method} {key}")
+        recordings.setdefault(method, {})[key] = call()
+
+    for video_id in args.songs:
+        record("get_song", video_id, lambda: ytmusic.get_song(video_id))
+    for query in args.queries:
+        record("search", f"{query}|{args.filter}", lambda: ytmusic.search(query, filter=args.filter, limit=20))
+    for channel_id in args.artists:
+        record("get_artist", channel_id, lambda: ytmusic.get_artist(channel_id))
+        artist = recordings["get_artist"][channel_id]
+        for name in ("albums", "singles"):
+            section = artist.get(name) or {}
+            if section.get("browseId") and section.get("params"):
+                browse_id, params = section["browseId"], section["params"]
+                record("get_artist_albums", f"{browse_id}|{params}",
+                       lambda: ytmusic.get_artist_albums(browse_id, params))
+    for playlist_id in args.playlists:
+        record("get_playlist", playlist_id, lambda: ytmusic.get_playlist(playlist_id, limit=200))
+    for country in args.countries:
+        record("get_charts", country, lambda: ytmusic.get_charts(country=country))
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(recordings, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    print(f"✅ Saved {sum(len(v) for v in recordings.values())} recordings to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
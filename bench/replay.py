@@ -0,0 +1,121 @@
+"""Recorded stand-in for the ``YTMusic`` client.
+
+``ReplayClient`` answers the methods the app calls (``get_song``,
+``search``, ``get_artist``, ``get_artist_albums``, ``get_playlist``,
+``get_charts``) from a JSON
+file of recorded responses (see ``record.py``). A key that was not
+recorded gets a copy of a recorded response with its ids rewritten, so a
+benchmark can use as many distinct keys as it likes. Latency and errors
+are injected from a seeded RNG, so runs are reproducible.
+
+Like the real client it is blocking, so it runs on the upstream pool.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+RECORDINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings.json")
+
+ID_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+
+
+class ReplayError(Exception):
+    """Injected upstream failure."""
+
+
+def synthetic_id(seed, length=11):
+    """A stable, valid-looking YouTube id derived from ``seed``."""
+    digest = hashlib.sha256(str(seed).encode("utf-8")).digest()
+    return "".join(ID_ALPHABET[b % len(ID_ALPHABET)] for b in digest[:length])
+
+
+class ReplayClient:
+    """Serve recorded responses with injected latency and errors."""
+
+    def __init__(self, recordings, latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        self.recordings = recordings
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {}
+
+    @classmethod
+    def from_file(cls, path=None, **kwargs):
+        with open(path or RECORDINGS_PATH, "rb") as f:
+            return cls(json.loads(f.read()), **kwargs)
+
+    def _respond(self, method, key):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            delay = self.latency + self._random.uniform(0, self.jitter) if self.jitter else self.latency
+            fail = self.error_rate and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise ReplayError(f"Injected {method} failure for {key!r}")
+
+        recorded = self.recordings.get(method) or {}
+        if key in recorded:
+            return copy.deepcopy(recorded[key]), True
+        if not recorded:
+            raise ReplayError(f"No recording for {method}")
+        return copy.deepcopy(next(iter(recorded.values()))), False
+
+    # ---------- YTMusic API ----------
+
+    def get_song(self, videoId, signatureTimestamp=None):
+        song, exact = self._respond("get_song", videoId)
+        if not exact:
+            details = song.get("videoDetails") or {}
+            old_id = details.get("videoId")
+            details["videoId"] = videoId
+            for fmt in (song.get("streamingData") or {}).get("adaptiveFormats", []):
+                if fmt.get("url") and old_id:
+                    fmt["url"] = fmt["url"].replace(old_id, videoId)
+        return song
+
+    def search(self, query, filter=None, scope=None, limit=20, ignore_spelling=False):
+        items, exact = self._respond("search", f"{query}|{filter}")
+        if not items:
+            return []
+        results = []
+        # Recorded results are repeated with fresh ids until ``limit`` is reached
+        for n in range(limit):
+            item = copy.deepcopy(items[n % len(items)])
+            if not exact or n >= len(items):
+                item["videoId"] = synthetic_id(f"{query}|{filter}|{n}")
+                item["title"] = f"{query} {item.get('title', '')}".strip()
+            results.append(item)
+        return results
+
+    def get_artist(self, channelId):
+        artist, exact = self._respond("get_artist", channelId)
+        if not exact:
+            artist["channelId"] = channelId
+        return artist
+
+    def get_artist_albums(self, channelId, params, limit=100, order=None):
+        albums, _ = self._respond("get_artist_albums", f"{channelId}|{params}")
+        return albums[:limit] if limit else albums
+
+    def get_playlist(self, playlistId, limit=100, related=False, suffixes=None):
+        playlist, exact = self._respond("get_playlist", playlistId)
+        playlist["id"] = playlistId
+        tracks = playlist.get("tracks") or []
+        total = int(playlist.get("trackCount") or len(tracks))
+        if not exact:
+            for n, track in enumerate(tracks):
+                track["videoId"] = synthetic_id(f"{playlistId}|{n}")
+        playlist["tracks"] = tracks[:min(limit, total)] if limit else tracks
+        return playlist
+
+    def get_charts(self, country="ZZ"):
+        charts, _ = self._respond("get_charts", country)
+        return charts
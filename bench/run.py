@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API against the recorded YTMusic stand-in.
+
+Each endpoint gets a fresh app whose YTMusic client is a ReplayClient. The
+app is driven in-process through httpx's ASGI transport at a fixed
+concurrency, so no network and no live YouTube Music are involved.
+Latency percentiles and requests per second are printed and saved as
+JSON, and can be compared with an earlier run.
+
+    python bench/run.py
+    python bench/run.py --endpoints song,search --concurrency 32 --requests 2000
+    python bench/run.py --latency-ms 120 --jitter-ms 80 --error-rate 0.05
+    python bench/run.py --compare bench/results/20240101-120000.json
+
+--keys sets how many distinct ids/queries each endpoint cycles through
+(more keys, fewer cache hits). The load generator shares the process
+with the app, so compare runs made on the same machine only.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from replay import RECORDINGS_PATH, ReplayClient, synthetic_id
+
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+
+
+def _keys(recordings, method, count, make):
+    recorded = list(recordings.get(method) or {})
+    return (recorded + [make(n) for n in range(count)])[:count]
+
+
+def build_scenarios(recordings, keys):
+    """Endpoint name -> function(i) returning (method, path, json body)."""
+    songs = _keys(recordings, "get_song", keys, lambda n: synthetic_id(f"song|{n}"))
+    queries = [key.split("|")[0] for key in recordings.get("search") or {}]
+    queries = (queries + [f"lagu {n}" for n in range(keys)])[:keys]
+    artists = _keys(recordings, "get_artist", keys, lambda n: f"UCbench{n:017d}")
+    playlists = _keys(recordings, "get_playlist", keys, lambda n: f"PLbench{n:026d}")
+
+    return {
+        "home": lambda i: ("GET", "/api/home", None),
+        "categories": lambda i: ("GET", "/api/categories", None),
+        "search": lambda i: ("GET", f"/api/search?query={quote(queries[i % keys])}", None),
+        "search_stream": lambda i: ("GET", f"/api/search/stream?query={quote(queries[i % keys])}", None),
+        "song": lambda i: ("GET", f"/api/song/{songs[i % keys]}", None),
+        "stream": lambda i: ("GET", f"/api/stream/{songs[i % keys]}", None),
+        "songs_batch": lambda i: (
+            "POST", "/api/songs/batch", {"ids": [songs[(i + n) % keys] for n in range(20)]}
+        ),
+        "artist": lambda i: ("GET", f"/api/artist/{artists[i % keys]}", None),
+        "artist_page": lambda i: ("GET", f"/api/artist/{artists[i % keys]}/page", None),
+        "playlist": lambda i: ("GET", f"/api/playlist/{playlists[i % keys]}", None),
+        "charts": lambda i: ("GET", "/api/charts", None),
+        "charts_regional": lambda i: ("GET", "/api/charts?country=ID,MY,SG,TH,PH,VN&merge=true", None),
+    }
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+    }
+
+
+async def drive(app, scenario, requests, concurrency, warmup):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def call(i):
+            method, path, body = scenario(i)
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            await response.aread()
+            return time.perf_counter() - start, response.status_code >= 400
+
+        for i in range(warmup):
+            await call(i)
+
+        latencies = []
+        errors = 0
+        counter = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                seconds, failed = await call(i)
+                latencies.append(seconds)
+                errors += failed
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def run_endpoint(name, scenario, args, recordings):
+    from core.app import create_app
+    from core.client import ClientPool
+    from core.services import Services
+
+    client = ReplayClient(
+        recordings,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    # Every pooled "client" is the same thread-safe stand-in; the pool itself is what's measured
+    services = Services(client=ClientPool(size=args.pool_size, factory=lambda: client))
+    app = create_app(profile=args.profile, services=services)
+
+    async def bench():
+        try:
+            return await drive(app, scenario, args.requests, args.concurrency, args.warmup)
+        finally:
+            await services.stop()
+
+    result = asyncio.run(bench())
+    result["upstream_calls"] = sum(client.calls.values())
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def print_table(results, previous=None):
+    header = f"{'endpoint':<14} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'upstream':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (
+            f"{name:<14} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+            f"{r['p99_ms']:>9.2f} {r['errors']:>7} {r['upstream_calls']:>9}"
+        )
+        old = (previous or {}).get(name)
+        if old:
+            def delta(key):
+                return f"{(r[key] - old[key]) / old[key] * 100:+.0f}%" if old[key] else "n/a"
+            line += f"   rps {delta('rps')}, p95 {delta('p95_ms')}, p99 {delta('p99_ms')}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--endpoints", default="all", help="Comma-separated endpoint names, or 'all'")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint")
+    parser.add_argument("--keys", type=int, default=50, help="Distinct ids/queries per endpoint")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Injected upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=25.0, help="Extra uniform random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream calls that fail")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--profile", default="production", help="App profile to benchmark")
+    parser.add_argument("--pool-size", type=int, default=None, help="YTMusic client pool size")
+    parser.add_argument("--recordings", default=RECORDINGS_PATH)
+    parser.add_argument("--out", default=None, help="Result file (default: bench/results/<time>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier result file to compare with")
+    args = parser.parse_args()
+
+    # Every run starts from an empty per-process cache unless told otherwise
+    os.environ.setdefault("CACHE_BACKEND", "memory")
+    # The stand-in has no rate limit to protect; set UPSTREAM_RATE_LIMIT to measure the limiter
+    os.environ.setdefault("UPSTREAM_RATE_LIMIT", "0")
+
+    with open(args.recordings, "rb") as f:
+        recordings = json.loads(f.read())
+    scenarios = build_scenarios(recordings, args.keys)
+    names = list(scenarios) if args.endpoints == "all" else args.endpoints.split(",")
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)} (known: {', '.join(scenarios)})")
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "rb") as f:
+            previous = json.loads(f.read())["endpoints"]
+
+    results = {}
+    for name in names:
+        print(f"⏱️  {name} ...", file=sys.stderr)
+        results[name] = run_endpoint(name, scenarios[name], args, recordings)
+
+    print_table(results, previous)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("out", "compare")},
+        "endpoints": results,
+    }
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"\n💾 Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Shared building blocks for the Web Music API entry points.
+
+Both ``backend/main.py`` (uvicorn) and ``api/index.py`` (Vercel / Mangum)
+import from here so that upstream handling lives in one place.
+"""
@@ -0,0 +1,102 @@
+"""Application factory shared by ``backend/main.py`` and ``api/index.py``.
+
+Both entry points build the same app from the shared routers and
+services, so a change (or a performance fix) lands in one place.
+
+Profiles (``APP_PROFILE``):
+
+* ``development``: one worker with ``--reload``, no compression.
+* ``production``: ``WEB_CONCURRENCY`` workers and no reload. Responses are
+  compressed with brotli (when installed) or gzip.
+
+Both profiles encode responses through ``core.wire``: orjson when it is
+installed, MessagePack for clients that send ``Accept: application/msgpack``.
+"""
+
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from core import config
+from core.cache_policy import VERSION_HEADER, CachePolicyMiddleware
+from core.compression import CompressionMiddleware
+from core.metrics import MetricsMiddleware
+from core.routers import ROUTERS
+from core.services import Services
+from core.wire import ApiResponse, WireFormatMiddleware
+
+VERSION = "2.3.0"
+
+PROFILES = ("development", "production")
+
+
+def resolve_profile(profile=None):
+    profile = profile or config.APP_PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"APP_PROFILE must be one of: {', '.join(PROFILES)}")
+    return profile
+
+
+def create_app(profile=None, static_dir=None, services=None):
+    """Build the API app. ``static_dir`` is mounted at ``/`` when it exists."""
+    profile = resolve_profile(profile)
+    production = profile == "production"
+    services = services or Services()
+
+    # Mangum runs with lifespan="off", so on Vercel this never starts and
+    # charts are revalidated when they are read instead.
+    @asynccontextmanager
+    async def lifespan(app):
+        services.start()
+        yield
+        await services.stop()
+
+    app = FastAPI(
+        title="Web Music API",
+        version=VERSION,
+        lifespan=lifespan,
+        default_response_class=ApiResponse,
+    )
+    app.state.services = services
+    app.state.profile = profile
+
+    if production:
+        app.add_middleware(CompressionMiddleware, minimum_size=config.COMPRESS_MIN_BYTES)
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[VERSION_HEADER],
+    )
+
+    # JSON or MessagePack, from the Accept header
+    app.add_middleware(WireFormatMiddleware)
+
+    # Cache-Control per route and the version tag the service worker invalidates on
+    app.add_middleware(CachePolicyMiddleware, version=config.API_CACHE_VERSION or VERSION)
+
+    # Outermost, so latencies include compression and CORS handling
+    app.add_middleware(MetricsMiddleware, metrics=services.metrics)
+
+    for router in ROUTERS:
+        app.include_router(router)
+
+    if static_dir and os.path.exists(static_dir):
+        from fastapi.staticfiles import StaticFiles
+        app.mount("/", StaticFiles(directory=static_dir, html=True), name="frontend")
+
+    return app
+
+
+def uvicorn_options(profile=None):
+    """Keyword arguments for ``uvicorn.run`` in the given profile."""
+    if resolve_profile(profile) == "production":
+        return {"workers": max(1, config.WEB_CONCURRENCY), "reload": False, "access_log": False}
+    # Shared code lives in core/, next to the entry point being run
+    return {"workers": 1, "reload": True, "reload_dirs": [os.getcwd(), os.path.dirname(os.path.abspath(__file__))]}
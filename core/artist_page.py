@@ -0,0 +1,139 @@
+"""Composite artist screen loaded in one round-trip.
+
+``get_artist`` returns only previews: the first few songs, albums, singles
+and videos, each with the id needed to load the full list. ``ArtistPage``
+loads the artist and then starts all the follow-up calls at once:
+
+* ``songs`` and ``videos``: a window of the playlist behind ``browseId``
+* ``albums`` and ``singles``: ``get_artist_albums(browseId, params)``
+* ``related``: already complete in ``get_artist``, nothing to fetch
+
+It waits for them up to a deadline. A section that is not done by then is
+answered with its preview, ``status: "pending"`` and a ``lazy`` URL that
+loads just that section. Its call keeps running in the background and
+warms the cache, so the lazy request is usually a hit. A section whose
+call fails falls back to its preview with ``status: "error"``.
+"""
+
+import asyncio
+import logging
+
+from core import config
+from core.schema import Album, RelatedArtist, SchemaError, Track, section_items
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("songs", "albums", "singles", "videos", "related")
+
+# section -> how its full list is loaded (None: get_artist has all of it)
+_LOADERS = {"songs": "playlist", "videos": "playlist", "albums": "albums", "singles": "albums", "related": None}
+
+
+def parse_sections(text):
+    """Comma-separated section names, all of them when empty."""
+    if not text:
+        return SECTIONS
+    names = tuple(dict.fromkeys(name.strip() for name in text.split(",") if name.strip()))
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise SchemaError(f"Unknown section {unknown[0]!r}; available: {', '.join(SECTIONS)}")
+    return names
+
+
+def section_records(name, items):
+    """Compact records for the raw items of one section."""
+    if name in ("songs", "videos"):
+        return [Track.from_item(item) for item in items]
+    if name in ("albums", "singles"):
+        return [Album.from_item(item, "single" if name == "singles" else "album") for item in items]
+    return [RelatedArtist.from_item(item) for item in items]
+
+
+class ArtistPage:
+    """Fan out the follow-up calls of an artist screen under one deadline."""
+
+    def __init__(self, cache, upstream, client, playlists, deadline=None, tracks=None):
+        self.cache = cache
+        self.upstream = upstream
+        self.client = client
+        self.playlists = playlists
+        self.deadline = config.ARTIST_PAGE_DEADLINE if deadline is None else deadline
+        self.tracks = tracks or config.ARTIST_PAGE_TRACKS
+        # Calls that outlived their request; kept so they are not garbage collected
+        self._background = set()
+        self.late = 0
+
+    async def artist(self, channel_id):
+        return await self.cache.get_or_load(
+            "artist", (channel_id,), lambda: self.upstream.run(self.client.get_artist, channel_id)
+        )
+
+    async def _full(self, name, section):
+        """The complete item list of one section."""
+        browse_id = section.get("browseId")
+        if _LOADERS[name] == "playlist":
+            window = await self.playlists.window(browse_id, 0, self.tracks)
+            return window["tracks"]
+        params = section.get("params")
+        return await self.cache.get_or_load(
+            "artist_albums", (browse_id, params),
+            lambda: self.upstream.run(self.client.get_artist_albums, browse_id, params),
+        )
+
+    def _detach(self, task):
+        # Let a late call finish into the cache; swallow its result or error
+        self._background.add(task)
+
+        def done(task):
+            self._background.discard(task)
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(done)
+
+    async def build(self, channel_id, sections=SECTIONS, deadline=None):
+        """Return ``(artist, {section: (status, raw items)})`` within the deadline.
+
+        ``status`` is ``"complete"`` (full list), ``"preview"`` (the preview
+        is all there is), ``"pending"`` (not done in time) or ``"error"``.
+        """
+        artist = await self.artist(channel_id)
+        # A lazy load of one late section may wait as long as an upstream call can take
+        deadline = self.deadline if deadline is None else min(deadline, config.UPSTREAM_TIMEOUT)
+
+        result = {}
+        tasks = {}
+        for name in sections:
+            section = artist.get(name)
+            if not isinstance(section, dict):
+                result[name] = ("complete", [])
+                continue
+            preview = section_items(section)
+            kind = _LOADERS[name]
+            if kind is None or not section.get("browseId"):
+                # Upstream only links a full list when the preview is cut short
+                result[name] = ("complete", preview)
+                continue
+            if kind == "albums" and not section.get("params"):
+                result[name] = ("preview", preview)
+                continue
+            tasks[name] = asyncio.ensure_future(self._full(name, section))
+            result[name] = ("pending", preview)
+
+        if tasks:
+            try:
+                _, pending = await asyncio.wait(tasks.values(), timeout=max(0.0, deadline))
+            except asyncio.CancelledError:
+                for task in tasks.values():
+                    self._detach(task)
+                raise
+            for name, task in tasks.items():
+                if task in pending:
+                    self.late += 1
+                    self._detach(task)
+                elif task.exception() is not None:
+                    logger.warning("Artist %s section %s failed: %s", channel_id, name, task.exception())
+                    result[name] = ("error", result[name][1])
+                else:
+                    result[name] = ("complete", task.result())
+        return artist, result
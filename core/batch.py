@@ -0,0 +1,64 @@
+"""Resolve many IDs in one request.
+
+Cached entries are answered straight away. Misses are fetched
+concurrently, with at most ``BATCH_CONCURRENCY`` upstream calls in flight
+per request. One failing ID does not fail the batch; its error is
+reported next to the results.
+"""
+
+import asyncio
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from core import config
+from core.cache import make_key
+
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=config.BATCH_MAX_IDS)
+
+
+def _error(e):
+    return {"status": getattr(e, "status_code", 500), "detail": str(e)}
+
+
+async def fetch_batch(cache, endpoint, ids, loader, validate=None, concurrency=None):
+    """Return ``{"results": {id: value}, "errors": {id: error}}`` for ``ids``.
+
+    ``loader(id)`` returns an awaitable that fetches one item upstream.
+    ``validate(id)`` may raise to reject an ID without calling upstream.
+    """
+    results = {}
+    errors = {}
+    misses = []
+
+    # dict.fromkeys drops duplicates but keeps the request order
+    valid = []
+    for item_id in dict.fromkeys(ids):
+        if validate is not None:
+            try:
+                validate(item_id)
+            except Exception as e:
+                errors[item_id] = _error(e)
+                continue
+        valid.append(item_id)
+
+    cached = await cache.get_many(endpoint, [make_key(endpoint, item_id) for item_id in valid])
+    for item_id, value in zip(valid, cached):
+        if value is not None:
+            results[item_id] = value
+        else:
+            misses.append(item_id)
+
+    semaphore = asyncio.Semaphore(concurrency or config.BATCH_CONCURRENCY)
+
+    async def fetch(item_id):
+        async with semaphore:
+            try:
+                results[item_id] = await cache.load(endpoint, (item_id,), lambda: loader(item_id))
+            except Exception as e:
+                errors[item_id] = _error(e)
+
+    await asyncio.gather(*(fetch(item_id) for item_id in misses))
+    return {"results": results, "errors": errors}
@@ -0,0 +1,293 @@
+"""TTL + LRU cache for upstream responses.
+
+Entries are keyed by endpoint name and normalized arguments and expire
+after a per-endpoint TTL. Where they are stored is up to the backend (see
+``core.cache_backends``): process memory by default, or a store shared by
+several workers.
+
+Endpoints with a stale TTL keep each entry that much longer after it
+expires. It is no longer returned by ``get``, but ``get_or_load`` falls
+back to it when loading a fresh value fails, so an upstream outage
+degrades to slightly old data instead of errors.
+
+Reads and writes are coroutines. Shared backends do blocking disk or
+network I/O, so their calls run in a worker thread; the memory backend
+is called inline.
+"""
+
+import asyncio
+import logging
+import time
+
+from core import config
+from core.cache_backends import backend_from_config
+from core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Entries of endpoints with a stale TTL are stored as {"v": value, "fresh_until": t}
+_ENVELOPE_KEYS = {"v", "fresh_until"}
+
+
+def normalize_query(query):
+    """Case-fold and collapse whitespace so equivalent searches share an entry."""
+    return " ".join(query.split()).casefold()
+
+
+def round_up(n, page_size):
+    """``n`` rounded up to a whole number of upstream pages."""
+    return -(-n // page_size) * page_size
+
+
+def make_key(endpoint, *args, **kwargs):
+    parts = [endpoint]
+    parts.extend(str(arg) for arg in args)
+    parts.extend(f"{name}={kwargs[name]}" for name in sorted(kwargs))
+    return "|".join(parts)
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "evictions", "expirations", "stale")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale": self.stale,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class ResponseCache:
+    """Per-endpoint TTL cache in front of a storage backend."""
+
+    def __init__(self, backend=None, ttls=None, default_ttl=None, stale_ttls=None):
+        self.backend = backend if backend is not None else backend_from_config()
+        self.ttls = dict(config.CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl or config.CACHE_DEFAULT_TTL
+        self.stale_ttls = dict(config.CACHE_STALE_TTLS if stale_ttls is None else stale_ttls)
+        self.stats = {}
+        # Concurrent misses for the same key share one upstream call
+        self.flights = SingleFlight()
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Call ``callback(endpoint, value)`` for every value stored from now on."""
+        self._subscribers.append(callback)
+
+    def _stats(self, endpoint):
+        stats = self.stats.get(endpoint)
+        if stats is None:
+            stats = self.stats[endpoint] = CacheStats()
+        return stats
+
+    def _count_expired(self, key):
+        self._stats(key.split("|", 1)[0]).expirations += 1
+
+    def _count_evicted(self, keys):
+        for key in keys:
+            self._stats(key.split("|", 1)[0]).evictions += 1
+
+    async def _call(self, method, *args):
+        """Run a backend operation; blocking backends run in a worker thread."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    # _read and _write may run in a worker thread; they return what happened
+    # and the coroutines below count it on the event loop
+
+    def _read(self, key):
+        """Return ``(value, fresh, expired)``; ``value`` is ``None`` when nothing is stored."""
+        try:
+            stored, expired = self.backend.get(key)
+        except Exception as e:
+            # A broken shared store degrades to a miss, never to an error
+            logger.warning("Cache backend get failed: %s", e)
+            return None, False, False
+        if isinstance(stored, dict) and stored.keys() == _ENVELOPE_KEYS:
+            return stored["v"], time.time() < stored["fresh_until"], expired
+        return stored, stored is not None, expired
+
+    def _read_many(self, keys):
+        return [self._read(key) for key in keys]
+
+    async def _lookup(self, key):
+        """``(value, fresh)`` for ``key``, with an expiration counted."""
+        value, fresh, expired = await self._call(self._read, key)
+        if expired:
+            self._count_expired(key)
+        return value, fresh
+
+    def _count(self, endpoint, fresh):
+        stats = self._stats(endpoint)
+        if fresh:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+    async def get(self, endpoint, key):
+        """Return the cached value or ``None`` on miss/expiry."""
+        value, fresh = await self._lookup(key)
+        self._count(endpoint, fresh)
+        return value if fresh else None
+
+    async def get_many(self, endpoint, keys):
+        """``get`` for several keys at once, in one trip to the backend."""
+        values = []
+        for key, (value, fresh, expired) in zip(keys, await self._call(self._read_many, keys)):
+            if expired:
+                self._count_expired(key)
+            self._count(endpoint, fresh)
+            values.append(value if fresh else None)
+        return values
+
+    async def peek(self, key):
+        """Return the fresh value without counting a hit or miss, or ``None``."""
+        value, fresh = await self._lookup(key)
+        return value if fresh else None
+
+    async def get_stale(self, endpoint, key):
+        """Return the stored value even if it has expired, or ``None``."""
+        value, _ = await self._lookup(key)
+        if value is not None:
+            self._stats(endpoint).stale += 1
+        return value
+
+    def _write(self, key, stored, ttl):
+        """Store ``stored``; return the keys the backend evicted."""
+        try:
+            return self.backend.set(key, stored, ttl)
+        except Exception as e:
+            logger.warning("Cache backend set failed: %s", e)
+            return []
+
+    def _prepare(self, endpoint, value, ttl):
+        """``(stored, backend_ttl)`` for ``value``, or ``None`` when ``endpoint`` is not cached."""
+        if ttl is None:
+            ttl = self.ttls.get(endpoint, self.default_ttl)
+        if ttl <= 0:
+            return None
+        stale_ttl = self.stale_ttls.get(endpoint, 0)
+        if stale_ttl > 0:
+            # Wall clock, so processes sharing a backend agree on freshness
+            return {"v": value, "fresh_until": time.time() + ttl}, ttl + stale_ttl
+        return value, ttl
+
+    def _publish(self, endpoint, value):
+        # Subscribers run on the event loop, whichever thread wrote the entry
+        for callback in self._subscribers:
+            try:
+                callback(endpoint, value)
+            except Exception as e:
+                logger.warning("Cache subscriber failed: %s", e)
+
+    async def set(self, endpoint, key, value, ttl=None):
+        prepared = self._prepare(endpoint, value, ttl)
+        if prepared is None:
+            return
+        self._count_evicted(await self._call(self._write, key, *prepared))
+        self._publish(endpoint, value)
+
+    async def count(self):
+        """Number of stored entries, expired ones included until the backend drops them."""
+        return await self._call(len, self.backend)
+
+    async def clear(self):
+        await self._call(self.backend.clear)
+
+    async def get_or_load(self, endpoint, args, loader, ttl=None):
+        """Return the cached value for ``endpoint(*args)`` or await ``loader()`` and store it.
+
+        Concurrent misses for the same key are coalesced into a single
+        ``loader()`` call. Failures are not cached; every waiter gets the error.
+        """
+        key = make_key(endpoint, *args)
+        value = await self.get(endpoint, key)
+        if value is not None:
+            return value
+        return await self.flights.do(key, lambda: self._load(endpoint, key, loader, ttl))
+
+    async def load(self, endpoint, args, loader, ttl=None):
+        """Like ``get_or_load`` for callers that already know the key is a miss."""
+        key = make_key(endpoint, *args)
+        return await self.flights.do(key, lambda: self._load(endpoint, key, loader, ttl))
+
+    async def _load(self, endpoint, key, loader, ttl):
+        try:
+            value = await loader()
+        except Exception as e:
+            stale = await self.stale_fallback(endpoint, key, e)
+            if stale is None:
+                raise
+            return stale
+        if value is not None:
+            await self.set(endpoint, key, value, ttl)
+        return value
+
+    async def grow(self, endpoint, key, needed, page_size, max_items, fetch, size):
+        """Reload a cached, growing list so it holds at least ``needed`` items.
+
+        Search results and playlist tracks are cached as one list that
+        upstream can only return from the start. ``fetch(limit)`` loads the
+        first ``limit`` items, rounded up to whole upstream pages and capped
+        at ``max_items``, and returns the new entry; ``size(entry)`` counts
+        its items. Calls for the same limit are coalesced. Calls for
+        different limits can overlap, so a result is only stored when it
+        holds more than the entry that is cached by the time it arrives.
+        """
+        limit = min(round_up(max(needed, 1), page_size), max_items)
+
+        async def load():
+            try:
+                fetched = await fetch(limit)
+            except Exception as e:
+                stale = await self.stale_fallback(endpoint, key, e)
+                if stale is None:
+                    raise
+                return stale
+            prepared = self._prepare(endpoint, fetched, None)
+            if prepared is None:
+                return fetched
+
+            def store():
+                # Compare and write in one trip to the backend; None when not written
+                current, fresh, _ = self._read(key)
+                if fresh and size(current) >= size(fetched):
+                    return None
+                return self._write(key, *prepared)
+
+            evicted = await self._call(store)
+            if evicted is not None:
+                self._count_evicted(evicted)
+                self._publish(endpoint, fetched)
+            return fetched
+
+        return await self.flights.do(f"{key}|{limit}", load)
+
+    async def stale_fallback(self, endpoint, key, error):
+        """Return the expired value for ``key`` after a failed load, or ``None``."""
+        if not self.stale_ttls.get(endpoint):
+            return None
+        stale = await self.get_stale(endpoint, key)
+        if stale is not None:
+            logger.warning("Serving stale %s after upstream failure: %s", key, error)
+        return stale
+
+    async def snapshot(self):
+        return {
+            **await self._call(self.backend.info),
+            "in_flight": len(self.flights),
+            "coalesced": self.flights.coalesced,
+            "endpoints": {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
@@ -0,0 +1,333 @@
+"""Storage backends for ``ResponseCache``.
+
+``MemoryBackend`` lives inside one process. ``SQLiteBackend`` keeps entries
+in a WAL-mode database file, so several uvicorn workers on one box (and
+the next cold start) can read what any of them fetched. ``RedisBackend``
+works with any client that has a redis-py style ``get``/``set``/``delete``/
+``scan_iter`` interface, so a local stand-in can be used in place of a
+server; ``scripts/check_cache_backends.py`` runs it against ``FakeRedis``.
+
+Shared backends store values as JSON. Upstream responses are JSON
+already, so nothing is lost. Their calls block on disk or network I/O
+(``blocking``), so ``ResponseCache`` makes them from a worker thread.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from core import config
+
+
+def estimate_size(obj):
+    """Rough deep size in bytes of a JSON-like value."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key) + estimate_size(value)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            size += estimate_size(item)
+    return size
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class CacheBackend:
+    """Interface every backend implements.
+
+    Expirations and evictions are returned rather than reported through a
+    callback, so the owning cache counts them on the event loop even when
+    the call ran in a worker thread.
+    """
+
+    name = "base"
+    # True when calls block on I/O and must be kept off the event loop
+    blocking = False
+
+    def get(self, key):
+        """Return ``(value, expired)``; ``value`` is ``None`` if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store ``value``; return the keys evicted to make room."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+    def info(self):
+        return {"backend": self.name, "entries": len(self)}
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process TTL + LRU store bounded by estimated memory use.
+
+    Only touched from the event loop, so it needs no locking.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or config.CACHE_MAX_BYTES
+        # key -> (expires_at, size, value)
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None, True
+        self._entries.move_to_end(key)
+        return value, False
+
+    def set(self, key, value, ttl):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return []
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        evicted = []
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            evicted.append(oldest)
+        return evicted
+
+    def delete(self, key):
+        if key in self._entries:
+            self._remove(key)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def info(self):
+        return {
+            "backend": self.name,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache shared by processes on one machine through a WAL-mode SQLite file.
+
+    Writes do not sum the table. Each process keeps a running estimate of
+    the total size: the size found by its last trim plus what it has
+    written since. A trim (drop expired rows, then the least recently used
+    until under ``max_bytes``) runs when that estimate goes over the limit,
+    and at least every ``TRIM_INTERVAL`` seconds to account for the writes
+    of other processes.
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    # Reads refresh the LRU timestamp at most this often, to keep reads mostly read-only
+    TOUCH_INTERVAL = 30.0
+    # Longest time between trims, whatever this process has written
+    TRIM_INTERVAL = 60.0
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or config.CACHE_SQLITE_PATH
+        self.max_bytes = max_bytes or config.CACHE_SQLITE_MAX_BYTES
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        # Unknown until the first write trims; the first write always does
+        self._bytes = None
+        self._trimmed_at = 0.0
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, False
+            value, expires_at, accessed_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                expired = True
+            else:
+                expired = False
+                if now - accessed_at > self.TOUCH_INTERVAL:
+                    self._conn.execute(
+                        "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+        if expired:
+            return None, True
+        return json.loads(value), False
+
+    def set(self, key, value, ttl):
+        encoded = _dumps(value)
+        size = len(encoded)
+        if size > self.max_bytes:
+            return []
+        now = time.time()
+        evicted = []
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, now + ttl, now),
+            )
+            if self._bytes is not None:
+                # A replaced row is counted twice until the next trim; that only trims early
+                self._bytes += size
+            if (self._bytes is None or self._bytes > self.max_bytes
+                    or now - self._trimmed_at >= self.TRIM_INTERVAL):
+                evicted = self._trim(now)
+        return evicted
+
+    def _trim(self, now):
+        """Drop expired rows, then the least recently used until under ``max_bytes``."""
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        evicted = []
+        if total > self.max_bytes:
+            # Read the oldest rows only as far as needed
+            rows = self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at")
+            for key, size in rows:
+                evicted.append(key)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            rows.close()
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", [(k,) for k in evicted])
+        self._bytes = total
+        self._trimmed_at = now
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(CacheBackend):
+    """Cache stored in Redis (or anything speaking the redis-py client API).
+
+    Expiry and eviction are left to the server (``maxmemory-policy allkeys-lru``).
+    """
+
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client=None, url=None, prefix="musik:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+            client = redis.Redis.from_url(
+                url or config.CACHE_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None, False
+        return json.loads(raw), False
+
+    def set(self, key, value, ttl):
+        # Redis wants whole milliseconds, at least one; it expires and evicts on its own
+        self.client.set(self.prefix + key, _dumps(value), px=max(1, int(ttl * 1000)))
+        return []
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def info(self):
+        return {"backend": self.name, "prefix": self.prefix}
+
+
+def backend_from_config():
+    """Build the backend selected by ``CACHE_BACKEND``."""
+    kind = config.CACHE_BACKEND
+    if kind == "sqlite":
+        return SQLiteBackend()
+    if kind == "redis":
+        return RedisBackend()
+    return MemoryBackend()
@@ -0,0 +1,76 @@
+"""Per-endpoint HTTP cache policies for browsers and the service worker.
+
+``CachePolicyMiddleware`` adds a ``Cache-Control`` header to successful
+GET responses, chosen by route. Freshness follows the server-side cache
+TTLs, and the ``stale-while-revalidate`` window follows the stale TTL.
+A client may therefore show a cached answer immediately and refresh it
+in the background. Responses that set their own ``Cache-Control`` keep
+it. This covers the precomputed home payload and thumbnails.
+
+Every API response also carries ``X-Cache-Version``. ``frontend/sw.js``
+drops its API cache when the version changes, so changing
+``API_CACHE_VERSION`` invalidates every client's cached API responses
+without shipping a new service worker.
+"""
+
+from starlette.datastructures import MutableHeaders
+
+from core import config
+
+VERSION_HEADER = "X-Cache-Version"
+NO_STORE = "no-store"
+
+
+def cache_control(max_age, stale_while_revalidate=0):
+    value = f"public, max-age={int(max_age)}"
+    if stale_while_revalidate:
+        value += f", stale-while-revalidate={int(stale_while_revalidate)}"
+    return value
+
+
+def default_policies():
+    """Route path -> ``Cache-Control`` value."""
+    ttls, stale = config.CACHE_TTLS, config.CACHE_STALE_TTL
+    # /api/home and /api/categories set theirs in PrecomputedPayload
+    return {
+        "/api/search": cache_control(ttls["search"], stale),
+        "/api/search/stream": cache_control(ttls["search"], stale),
+        "/api/song/{video_id}": cache_control(ttls["song"], stale),
+        "/api/artist/{channel_id}": cache_control(ttls["artist"], stale),
+        "/api/artist/{channel_id}/page": cache_control(ttls["artist"], stale),
+        "/api/playlist/{playlist_id}": cache_control(ttls["playlist"], stale),
+        "/api/playlist/{playlist_id}/stream": cache_control(ttls["playlist"], stale),
+        "/api/charts": cache_control(config.CHARTS_REFRESH_INTERVAL, config.CHARTS_SNAPSHOT_TTL),
+        # Stream URLs expire, library sync is per device, and health/metrics must always be live
+        "/api/stream/{video_id}": NO_STORE,
+        "/api/library/sync": NO_STORE,
+        "/api/health": NO_STORE,
+        "/api/metrics": NO_STORE,
+    }
+
+
+class CachePolicyMiddleware:
+    """ASGI middleware adding ``Cache-Control`` and ``X-Cache-Version`` to API responses."""
+
+    def __init__(self, app, version, policies=None):
+        self.app = app
+        self.version = version
+        self.policies = default_policies() if policies is None else policies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_policy(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[VERSION_HEADER] = self.version
+                route = scope.get("route")
+                policy = self.policies.get(getattr(route, "path", None))
+                if policy is not None and "cache-control" not in headers:
+                    cacheable = scope["method"] in ("GET", "HEAD") and message["status"] == 200
+                    headers["Cache-Control"] = policy if cacheable or policy == NO_STORE else NO_STORE
+            await send(message)
+
+        await self.app(scope, receive, send_with_policy)
@@ -0,0 +1,139 @@
+"""Pool of lazily constructed YTMusic clients.
+
+A ``YTMusic`` instance wraps one ``requests.Session``. Sharing a single
+instance across the upstream worker threads funnels every call through
+one session, and ``requests`` does not promise that a session is
+thread-safe. ``ClientPool`` keeps up to ``YTMUSIC_POOL_SIZE`` clients
+instead. Each client has its own keep-alive session, with a connection
+pool of ``YTMUSIC_POOL_CONNECTIONS``. A call checks a client out for its
+duration and returns it afterwards.
+
+Importing ``ytmusicapi`` (and ``requests`` with it) and building
+``YTMusic()`` is a large part of a cold start. Clients are therefore
+built on first use, inside the upstream worker thread that needs one,
+never on the event loop. Requests that never reach upstream (home,
+categories, cached responses) never pay for it. Method lookups on the
+pool return small wrappers, so ``upstream.run(pool.get_song, video_id)``
+works as it would with a single client.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from core import config
+from core.upstream import UpstreamOverloaded
+
+
+def make_client(connections=None, timeout=None):
+    """A ``YTMusic`` with its own keep-alive session and connection pool."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from ytmusicapi import YTMusic
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=connections or config.YTMUSIC_POOL_CONNECTIONS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # ytmusicapi's own sessions wait 30s; never wait longer than the call may take
+    session.request = functools.partial(session.request, timeout=timeout or config.UPSTREAM_TIMEOUT)
+    return YTMusic(requests_session=session)
+
+
+class ClientPool:
+    """Up to ``size`` clients, built on demand and lent out one call at a time."""
+
+    def __init__(self, size=None, factory=None, timeout=None):
+        self.size = size or config.YTMUSIC_POOL_SIZE
+        self._factory = factory or make_client
+        self.timeout = config.YTMUSIC_POOL_TIMEOUT if timeout is None else timeout
+        self._cond = threading.Condition()
+        # Most recently returned last, so warm connections are reused first
+        self._idle = []
+        self._created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.failures = 0
+
+    @property
+    def loaded(self):
+        return self._created > 0
+
+    @property
+    def in_use(self):
+        return self._created - len(self._idle)
+
+    def checkout(self):
+        """Take an idle client, build a new one, or wait for one to come back."""
+        started = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    client = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    # Reserve the slot; the client is built outside the lock
+                    self._created += 1
+                    client = None
+                    break
+                now = time.monotonic()
+                if started is None:
+                    started = now
+                    self.waits += 1
+                remaining = started + self.timeout - now
+                if remaining <= 0:
+                    self.wait_seconds += now - started
+                    raise UpstreamOverloaded("No YTMusic client free, try again later")
+                self._cond.wait(remaining)
+            self.checkouts += 1
+            if started is not None:
+                self.wait_seconds += time.monotonic() - started
+
+        if client is None:
+            try:
+                client = self._factory()
+            except BaseException:
+                with self._cond:
+                    self._created -= 1
+                    self.failures += 1
+                    self._cond.notify()
+                raise
+        return client
+
+    def checkin(self, client):
+        with self._cond:
+            self._idle.append(client)
+            self._cond.notify()
+
+    @contextmanager
+    def client(self):
+        client = self.checkout()
+        try:
+            yield client
+        finally:
+            self.checkin(client)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            with self.client() as client:
+                return getattr(client, name)(*args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._created - len(self._idle),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 6),
+                "failures": self.failures,
+            }
@@ -0,0 +1,190 @@
+"""Runtime settings, read once from environment variables."""
+
+import os
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def env_list(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def env_float(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+# ============== APP ==============
+
+# "production" adds response compression and multiple workers, and drops --reload
+APP_PROFILE = os.environ.get("APP_PROFILE", "development").strip().lower()
+# Worker processes for uvicorn in the production profile
+WEB_CONCURRENCY = env_int("WEB_CONCURRENCY", os.cpu_count() or 1)
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = env_int("COMPRESS_MIN_BYTES", 1024)
+
+# ============== UPSTREAM ==============
+
+# Threads dedicated to blocking ytmusicapi calls
+UPSTREAM_MAX_WORKERS = env_int("UPSTREAM_MAX_WORKERS", min(32, (os.cpu_count() or 1) * 4))
+# Calls allowed to wait for a free thread before new ones are rejected with 503
+UPSTREAM_MAX_QUEUE = env_int("UPSTREAM_MAX_QUEUE", 64)
+# Seconds a request waits for an upstream call before giving up with 504
+UPSTREAM_TIMEOUT = env_float("UPSTREAM_TIMEOUT", 10.0)
+# YTMusic clients (one keep-alive HTTP session each); by default one per upstream thread
+YTMUSIC_POOL_SIZE = env_int("YTMUSIC_POOL_SIZE", UPSTREAM_MAX_WORKERS)
+# Connections each client's session keeps open to YouTube Music
+YTMUSIC_POOL_CONNECTIONS = env_int("YTMUSIC_POOL_CONNECTIONS", 4)
+# Seconds a call waits for a free client before it is rejected with 503
+YTMUSIC_POOL_TIMEOUT = env_float("YTMUSIC_POOL_TIMEOUT", UPSTREAM_TIMEOUT)
+
+# ============== RESILIENCE ==============
+
+# Upstream calls per second (token bucket, 0 disables); halved on HTTP 429, regained slowly
+UPSTREAM_RATE_LIMIT = env_float("UPSTREAM_RATE_LIMIT", 20.0)
+UPSTREAM_RATE_BURST = env_int("UPSTREAM_RATE_BURST", 40)
+# Seconds a call may wait for a token before it is rejected with 503
+UPSTREAM_RATE_MAX_WAIT = env_float("UPSTREAM_RATE_MAX_WAIT", 2.0)
+# Extra attempts after a failed call, with jittered exponential backoff
+UPSTREAM_RETRIES = env_int("UPSTREAM_RETRIES", 2)
+UPSTREAM_RETRY_BASE_DELAY = env_float("UPSTREAM_RETRY_BASE_DELAY", 0.1)
+# Retries allowed per call made (0.1 = at most 10% extra load)
+UPSTREAM_RETRY_BUDGET = env_float("UPSTREAM_RETRY_BUDGET", 0.1)
+# The breaker opens when this share of calls in the window failed...
+BREAKER_FAILURE_RATIO = env_float("BREAKER_FAILURE_RATIO", 0.5)
+# ...and the window holds at least this many calls
+BREAKER_MIN_CALLS = env_int("BREAKER_MIN_CALLS", 10)
+BREAKER_WINDOW = env_float("BREAKER_WINDOW", 30.0)
+# Seconds the breaker stays open before one probe call is let through
+BREAKER_OPEN_SECONDS = env_float("BREAKER_OPEN_SECONDS", 15.0)
+
+# ============== CACHE ==============
+
+# Where cached responses live: "memory" (per process), "sqlite" (shared by
+# the workers on one machine) or "redis"
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory").strip().lower()
+CACHE_SQLITE_PATH = os.environ.get(
+    "CACHE_SQLITE_PATH", os.path.join(os.environ.get("TMPDIR", "/tmp"), "web-music-cache.sqlite3")
+)
+CACHE_SQLITE_MAX_BYTES = env_int("CACHE_SQLITE_MAX_MB", 256) * 1024 * 1024
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Upper bound on the estimated memory held by the in-process cache
+CACHE_MAX_BYTES = env_int("CACHE_MAX_MB", 64) * 1024 * 1024
+CACHE_DEFAULT_TTL = env_float("CACHE_DEFAULT_TTL", 300.0)
+# Seconds each endpoint's responses stay fresh
+CACHE_TTLS = {
+    "search": env_float("CACHE_TTL_SEARCH", 600.0),
+    "song": env_float("CACHE_TTL_SONG", 3600.0),
+    "artist": env_float("CACHE_TTL_ARTIST", 3600.0),
+    "artist_albums": env_float("CACHE_TTL_ARTIST", 3600.0),
+    "playlist": env_float("CACHE_TTL_PLAYLIST", 900.0),
+}
+# Tag sent as X-Cache-Version (default: the app version); changing it makes
+# service workers drop their cached API responses
+API_CACHE_VERSION = os.environ.get("API_CACHE_VERSION", "").strip()
+# Seconds an expired response is kept to be served when upstream fails
+CACHE_STALE_TTL = env_float("CACHE_STALE_TTL", 86400.0)
+CACHE_STALE_TTLS = {
+    endpoint: CACHE_STALE_TTL for endpoint in ("search", "song", "artist", "artist_albums", "playlist")
+}
+
+# ============== STREAM ==============
+
+# Resolved stream URLs are dropped this many seconds before they expire
+STREAM_EXPIRY_MARGIN = env_float("STREAM_EXPIRY_MARGIN", 300.0)
+# A hit this close to expiry triggers a background refresh
+STREAM_REFRESH_WINDOW = env_float("STREAM_REFRESH_WINDOW", 1800.0)
+# Lifetime assumed when upstream does not report expiresInSeconds
+STREAM_DEFAULT_LIFETIME = env_float("STREAM_DEFAULT_LIFETIME", 21540.0)
+
+# ============== CHARTS ==============
+
+# Countries whose charts are refreshed in the background; the first one feeds /api/home
+CHARTS_COUNTRIES = [c.upper() for c in env_list("CHARTS_COUNTRIES", ["ID"])]
+CHARTS_REFRESH_INTERVAL = env_float("CHARTS_REFRESH_INTERVAL", 900.0)
+# How long a stored snapshot may still be served (stale) by another worker or cold start
+CHARTS_SNAPSHOT_TTL = env_float("CHARTS_SNAPSHOT_TTL", 86400.0)
+# Countries one /api/charts request may ask for, and how many of them are fetched at once
+CHARTS_MAX_COUNTRIES = env_int("CHARTS_MAX_COUNTRIES", 20)
+CHARTS_CONCURRENCY = env_int("CHARTS_CONCURRENCY", 4)
+
+# ============== BATCH ==============
+
+# Most IDs accepted by one /api/songs/batch or /api/artists/batch request
+BATCH_MAX_IDS = env_int("BATCH_MAX_IDS", 200)
+# Upstream calls one batch request may have in flight at the same time
+BATCH_CONCURRENCY = env_int("BATCH_CONCURRENCY", 8)
+
+# ============== ARTIST PAGE ==============
+
+# Seconds /api/artist/{id}/page waits for its follow-up calls; later sections are lazy-loaded
+ARTIST_PAGE_DEADLINE = env_float("ARTIST_PAGE_DEADLINE", 1.5)
+# Tracks loaded for the songs and videos sections
+ARTIST_PAGE_TRACKS = env_int("ARTIST_PAGE_TRACKS", 50)
+
+# ============== PREFETCH ==============
+
+# Upcoming queue items /api/prefetch warms (stream info and song metadata)
+PREFETCH_DEPTH = env_int("PREFETCH_DEPTH", 3)
+# Prefetch fetches running at once, across all clients of a worker
+PREFETCH_CONCURRENCY = env_int("PREFETCH_CONCURRENCY", 2)
+# Ids waiting to be prefetched before new ones are dropped
+PREFETCH_MAX_PENDING = env_int("PREFETCH_MAX_PENDING", 64)
+
+# ============== SEARCH ==============
+
+# Deepest result a search cursor can page to
+SEARCH_MAX_RESULTS = env_int("SEARCH_MAX_RESULTS", 200)
+
+# ============== LOCAL SEARCH INDEX ==============
+
+# Tracks kept in the in-process search index (oldest dropped first)
+LOCAL_INDEX_MAX_DOCS = env_int("LOCAL_INDEX_MAX_DOCS", 50000)
+# A first search page is answered locally when the index has at least this many hits
+LOCAL_SEARCH_MIN_RESULTS = env_int("LOCAL_SEARCH_MIN_RESULTS", 5)
+
+# ============== THUMBNAILS ==============
+
+# Disk cache for /api/thumb originals and resized variants
+THUMB_CACHE_DIR = os.environ.get(
+    "THUMB_CACHE_DIR", os.path.join(os.environ.get("TMPDIR", "/tmp"), "web-music-thumbs")
+)
+THUMB_CACHE_MAX_BYTES = env_int("THUMB_CACHE_MAX_MB", 256) * 1024 * 1024
+# Seconds to wait for i.ytimg.com
+THUMB_FETCH_TIMEOUT = env_float("THUMB_FETCH_TIMEOUT", 5.0)
+
+# ============== LIBRARY SYNC ==============
+
+# Liked songs and recently played synced across devices; /tmp does not survive serverless instances
+LIBRARY_DB_PATH = os.environ.get(
+    "LIBRARY_DB_PATH", os.path.join(os.environ.get("TMPDIR", "/tmp"), "web-music-library.sqlite3")
+)
+# Changes accepted in one sync request
+LIBRARY_MAX_CHANGES = env_int("LIBRARY_MAX_CHANGES", 500)
+# Changes returned per sync response; the client asks again while "more" is set
+LIBRARY_PAGE_SIZE = env_int("LIBRARY_PAGE_SIZE", 200)
+# Recently played entries kept per library
+LIBRARY_RECENT_MAX = env_int("LIBRARY_RECENT_MAX", 50)
+# Seconds deletions are remembered; devices that last synced before that get the full library
+LIBRARY_TOMBSTONE_TTL = env_int("LIBRARY_TOMBSTONE_TTL", 30 * 24 * 3600)
+
+# ============== PLAYLIST ==============
+
+# Deepest track a playlist window or stream will load
+PLAYLIST_MAX_TRACKS = env_int("PLAYLIST_MAX_TRACKS", 5000)
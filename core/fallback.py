@@ -0,0 +1,39 @@
+"""Mock responses served when upstream fails.
+
+The frontend keeps working (with a small built-in catalogue) while
+YouTube Music is unreachable. The data lives in ``core/data/fallback.json``
+and is only read the first time a fallback is needed.
+"""
+
+import functools
+import json
+import os
+
+FALLBACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fallback.json")
+
+
+@functools.lru_cache(maxsize=1)
+def _data():
+    with open(FALLBACK_PATH, "rb") as f:
+        return json.loads(f.read())
+
+
+def search_results(query):
+    query_lower = query.lower()
+    return [
+        song for song in _data()["search"]
+        if query_lower in song["title"].lower() or query_lower in song["artist"].lower()
+    ]
+
+
+def song(video_id):
+    return {
+        "videoId": video_id,
+        "title": "Unknown Song",
+        "artist": "Unknown Artist",
+        "thumbnail": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+    }
+
+
+def charts():
+    return _data()["charts"]
@@ -0,0 +1,312 @@
+"""Library sync: liked songs and recently played, shared across devices.
+
+The browser keeps its library in IndexedDB (``frontend/js/db.js``) and
+syncs it with one request: ``POST /api/library/sync``. The request carries
+the changes made on this device since the last sync, plus the ``version``
+token that sync returned. The response carries every entry that other
+devices changed after that version, already reduced to compact track
+metadata, and a new token. The browser applies the response in a single
+IndexedDB transaction.
+
+``LibraryStore`` keeps a compacted change log in SQLite: one row per
+(library, collection, track) holding its latest state, the device that
+wrote it and a sequence number that grows with every write. Deletes are
+kept as tombstones, so other devices learn about them, and are purged
+after ``LIBRARY_TOMBSTONE_TTL``. Conflicting writes are resolved by the
+client timestamp ``at`` (last writer wins).
+
+A token contains the store's epoch, a random id created with the
+database. A token from another epoch means the server lost its data (for
+example ``/tmp`` on a new serverless instance). So does a token older than
+the last tombstone purge. In both cases the response says ``reset`` and
+includes the full library. The browser then merges it and pushes
+everything it has, so the server is repopulated instead of the browser
+being emptied. Long responses are paged (``more``); the token of a page
+in the middle of a full state says so, so the next page continues that
+state rather than the change log.
+
+A library is identified by a random id the browser creates; there are
+no user accounts.
+"""
+
+import asyncio
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Annotated, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from core import config
+from core.batch import fetch_batch
+from core.schema import Projection, Track
+from core.stream import validate_video_id
+
+COLLECTIONS = ("liked", "recent")
+TRACK_FIELDS = ("id", "title", "artist", "thumbnail", "duration")
+_ID = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+class LibraryError(Exception):
+    status_code = 400
+
+
+# ============== REQUEST MODELS ==============
+
+class LibraryTrack(BaseModel):
+    """Compact metadata of a pushed track; every device of the library downloads it."""
+
+    id: Optional[str] = Field(None, max_length=64)
+    title: Optional[str] = Field(None, max_length=300)
+    artist: Optional[str] = Field(None, max_length=300)
+    thumbnail: Optional[str] = Field(None, max_length=2048)
+    # Seconds, or the "3:25" text older clients kept
+    duration: Optional[Union[int, float, Annotated[str, Field(max_length=16)]]] = None
+
+
+class LibraryChange(BaseModel):
+    collection: str
+    id: str = Field(..., min_length=1, max_length=64)
+    op: str = "put"
+    # Client time of the change in milliseconds; the newest change wins
+    at: float
+    track: Optional[LibraryTrack] = None
+
+
+class SyncRequest(BaseModel):
+    library: str
+    device: str
+    since: Optional[str] = None
+    changes: List[LibraryChange] = Field(default_factory=list, max_length=config.LIBRARY_MAX_CHANGES)
+
+
+def _compact(track, video_id):
+    if isinstance(track, LibraryTrack):
+        track = track.model_dump()
+    track = track or {}
+    out = {field: track.get(field) for field in TRACK_FIELDS}
+    out["id"] = video_id
+    return out
+
+
+# ============== STORE ==============
+
+class LibraryStore:
+    """Compacted per-library change log in a WAL-mode SQLite file."""
+
+    def __init__(self, path=None):
+        self.path = path or config.LIBRARY_DB_PATH
+        self._lock = threading.Lock()
+        self._conn = None
+        self.epoch = None
+
+    def _connect(self):
+        # Opened on first use, so startup and cold starts never touch the disk
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " library TEXT NOT NULL,"
+            " collection TEXT NOT NULL,"
+            " item_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " device TEXT NOT NULL,"
+            " at REAL NOT NULL,"
+            " deleted INTEGER NOT NULL,"
+            " track TEXT,"
+            " PRIMARY KEY (library, collection, item_id))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_seq ON entries (library, seq)")
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('epoch', ?)", (secrets.token_hex(8),))
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('seq', '0')")
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('purged', '0')")
+        self.epoch = conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+        self._conn = conn
+        return conn
+
+    def _meta_int(self, conn, key):
+        return int(conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0])
+
+    def token(self, seq, snapshot=False):
+        return f"{self.epoch}.{seq}.s" if snapshot else f"{self.epoch}.{seq}"
+
+    def _parse_token(self, conn, token):
+        """``(seq, snapshot)`` to continue after, or ``None`` when the client must reset."""
+        if not token:
+            return None
+        epoch, _, rest = token.partition(".")
+        seq, _, snapshot = rest.partition(".")
+        if epoch != self.epoch or not seq.isdigit() or snapshot not in ("", "s"):
+            return None
+        seq = int(seq)
+        if seq > self._meta_int(conn, "seq"):
+            return None
+        # A snapshot being paged does not need the purged tombstones; a change log does
+        if not snapshot and seq < self._meta_int(conn, "purged"):
+            return None
+        return seq, bool(snapshot)
+
+    def _write(self, conn, library, device, changes, recent_max):
+        seq = self._meta_int(conn, "seq")
+        for change in changes:
+            row = conn.execute(
+                "SELECT at FROM entries WHERE library = ? AND collection = ? AND item_id = ?",
+                (library, change.collection, change.id),
+            ).fetchone()
+            if row is not None and row[0] > change.at:
+                continue
+            seq += 1
+            deleted = change.op == "delete"
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (library, change.collection, change.id, seq, device, change.at, int(deleted),
+                 None if deleted else json.dumps(_compact(change.track, change.id), ensure_ascii=False)),
+            )
+
+        # Recently played is a bounded list; older entries become tombstones everybody sees
+        overflow = conn.execute(
+            "SELECT item_id FROM entries WHERE library = ? AND collection = 'recent' AND deleted = 0"
+            " ORDER BY at DESC LIMIT -1 OFFSET ?",
+            (library, recent_max),
+        ).fetchall()
+        for (item_id,) in overflow:
+            seq += 1
+            conn.execute(
+                "UPDATE entries SET seq = ?, device = '', deleted = 1, track = NULL"
+                " WHERE library = ? AND collection = 'recent' AND item_id = ?",
+                (seq, library, item_id),
+            )
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'seq'", (str(seq),))
+
+    def _purge(self, conn, now, ttl):
+        # at is client milliseconds; purging is coarse, so clock skew does not matter much
+        cutoff = (now - ttl) * 1000
+        row = conn.execute("SELECT MAX(seq) FROM entries WHERE deleted = 1 AND at < ?", (cutoff,)).fetchone()
+        if row[0] is not None:
+            conn.execute("DELETE FROM entries WHERE deleted = 1 AND at < ?", (cutoff,))
+            purged = max(self._meta_int(conn, "purged"), row[0])
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'purged'", (str(purged),))
+
+    def sync(self, library, device, since, changes, limit=None, recent_max=None, tombstone_ttl=None):
+        """Store ``changes`` and return ``{"version", "reset", "more", "changes"}``."""
+        limit = limit or config.LIBRARY_PAGE_SIZE
+        recent_max = recent_max or config.LIBRARY_RECENT_MAX
+        tombstone_ttl = config.LIBRARY_TOMBSTONE_TTL if tombstone_ttl is None else tombstone_ttl
+        with self._lock:
+            conn = self._connect()
+            # IMMEDIATE takes the write lock up front, so workers never interleave sequence numbers
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                position = self._parse_token(conn, since)
+                if changes:
+                    self._write(conn, library, device, changes, recent_max)
+                    self._purge(conn, time.time(), tombstone_ttl)
+                columns = "SELECT collection, item_id, seq, at, deleted, track FROM entries"
+                if position is None:
+                    # Full state, live entries only, including this device's own
+                    rows = conn.execute(
+                        columns + " WHERE library = ? AND deleted = 0 ORDER BY seq LIMIT ?",
+                        (library, limit + 1),
+                    ).fetchall()
+                elif position[1]:
+                    # Later pages of a full state; a row changed meanwhile moved past the cursor
+                    rows = conn.execute(
+                        columns + " WHERE library = ? AND seq > ? ORDER BY seq LIMIT ?",
+                        (library, position[0], limit + 1),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        columns + " WHERE library = ? AND seq > ? AND device != ? ORDER BY seq LIMIT ?",
+                        (library, position[0], device, limit + 1),
+                    ).fetchall()
+                current = self._meta_int(conn, "seq")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        # With more to come, the next page continues after the last row sent
+        snapshot = position is None or position[1]
+        version = self.token(rows[-1][2], snapshot) if more else self.token(current)
+        return {
+            "version": version,
+            "reset": position is None,
+            "more": more,
+            "changes": [
+                {
+                    "collection": collection,
+                    "id": item_id,
+                    "op": "delete" if deleted else "put",
+                    "at": at,
+                    "track": None if deleted else json.loads(track or "null"),
+                }
+                for collection, item_id, _, at, deleted, track in rows
+            ],
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ============== SERVICE ==============
+
+class Library:
+    """Validate sync requests and fill in missing track metadata before storing them."""
+
+    def __init__(self, cache, upstream, client, store=None):
+        self.cache = cache
+        self.upstream = upstream
+        self.client = client
+        self.store = store or LibraryStore()
+        self.view = Projection(Track, ",".join(TRACK_FIELDS), "medium")
+
+    def _validate(self, body):
+        for name, value in (("library", body.library), ("device", body.device)):
+            if not _ID.match(value):
+                raise LibraryError(f"{name} must be 8-64 characters of A-Z, a-z, 0-9, _ or -")
+        for change in body.changes:
+            if change.collection not in COLLECTIONS:
+                raise LibraryError(f"collection must be one of {', '.join(COLLECTIONS)}")
+            if change.op not in ("put", "delete"):
+                raise LibraryError("op must be put or delete")
+
+    async def _resolve(self, changes):
+        """Compact metadata for every put; ids pushed without a title are looked up.
+
+        Lookups are capped like a batch request; ids past the cap, invalid
+        ids and failed lookups keep the metadata the client sent.
+        """
+        missing = list(dict.fromkeys(c.id for c in changes if c.op == "put" and not (c.track and c.track.title)))
+        resolved = {}
+        if missing:
+            batch = await fetch_batch(
+                self.cache, "song", missing[:config.BATCH_MAX_IDS],
+                lambda video_id: self.upstream.run(self.client.get_song, video_id),
+                validate=validate_video_id,
+            )
+            resolved = {
+                video_id: self.view.apply(Track.from_song(song)) for video_id, song in batch["results"].items()
+            }
+        for change in changes:
+            if change.op == "put":
+                change.track = resolved.get(change.id) or _compact(change.track, change.id)
+
+    async def sync(self, body):
+        self._validate(body)
+        await self._resolve(body.changes)
+        # SQLite may wait for another worker's write lock; keep that off the event loop
+        return await asyncio.to_thread(self.store.sync, body.library, body.device, body.since, body.changes)
@@ -0,0 +1,297 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Recording is a dict lookup, a bisect and a few integer increments under a
+lock, so it stays cheap on the hot path and needs no external service.
+Request metrics are labelled with the route template (``/api/song/{video_id}``),
+never the raw path, so label cardinality stays bounded. Gauges that mirror
+other components (thread pool, cache, search index) are read only when
+``/api/metrics`` is scraped.
+
+Each worker process keeps its own numbers; scrape every worker, or run
+one worker, to see everything.
+"""
+
+import bisect
+import threading
+import time
+
+# Seconds; covers cached responses (sub-millisecond) up to upstream timeouts
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Starlette appends "; charset=utf-8"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            yield self.name, _labels(self.labels, label_values), value
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    """Bucketed distribution per label set (buckets are rendered cumulatively)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket + overflow, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for label_values, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                yield f"{self.name}_bucket", _labels(self.labels, label_values, le), cumulative
+            yield f"{self.name}_sum", _labels(self.labels, label_values), round(total, 6)
+            yield f"{self.name}_count", _labels(self.labels, label_values), cumulative
+
+
+class Metrics:
+    """Metrics of one app: requests, upstream calls, pool, cache and index."""
+
+    def __init__(self):
+        self.requests = Counter(
+            "musik_http_requests_total", "HTTP requests by route, method and status",
+            ("route", "method", "status"),
+        )
+        self.request_latency = Histogram(
+            "musik_http_request_duration_seconds", "HTTP request latency by route",
+            ("route", "method"),
+        )
+        self.in_flight = Gauge("musik_http_requests_in_flight", "HTTP requests being served")
+        self.upstream_latency = Histogram(
+            "musik_upstream_call_duration_seconds", "YTMusic call latency by method", ("method",),
+        )
+        self.upstream_errors = Counter(
+            "musik_upstream_errors_total", "Failed YTMusic calls by method and exception",
+            ("method", "error"),
+        )
+        self._metrics = (
+            self.requests, self.request_latency, self.in_flight,
+            self.upstream_latency, self.upstream_errors,
+        )
+
+    # ---------- recording ----------
+
+    def observe_upstream(self, method, seconds, error):
+        """``UpstreamExecutor`` listener; runs on the worker thread."""
+        self.upstream_latency.observe(seconds, method)
+        if error is not None:
+            self.upstream_errors.inc(method, error)
+
+    def observe_request(self, route, method, status, seconds):
+        self.requests.inc(route, method, str(status))
+        self.request_latency.observe(seconds, route, method)
+
+    # ---------- exposition ----------
+
+    def _collected(self, services, cache):
+        """Gauges read from other components at scrape time."""
+        upstream = services.upstream
+        yield "gauge", "musik_upstream_pool_workers", "Threads available for YTMusic calls", [
+            ("", upstream.max_workers)]
+        yield "gauge", "musik_upstream_pool_pending", "YTMusic calls running or queued", [
+            ("", upstream.pending)]
+        yield "gauge", "musik_upstream_pool_queue_depth", "YTMusic calls waiting for a thread", [
+            ("", upstream.queue_depth)]
+        yield "counter", "musik_upstream_rejected_total", "YTMusic calls rejected as overloaded", [
+            ("", upstream.rejected)]
+        yield "counter", "musik_upstream_timeouts_total", "YTMusic calls that timed out", [
+            ("", upstream.timeouts)]
+
+        pool = getattr(services.ytmusic, "stats", None)
+        if callable(pool):
+            pool = pool()
+            yield "gauge", "musik_ytmusic_pool_size", "YTMusic clients the pool may hold", [("", pool["size"])]
+            yield "gauge", "musik_ytmusic_pool_clients", "YTMusic clients built", [("", pool["created"])]
+            yield "gauge", "musik_ytmusic_pool_in_use", "YTMusic clients checked out", [("", pool["in_use"])]
+            yield "counter", "musik_ytmusic_pool_checkouts_total", "YTMusic client checkouts", [
+                ("", pool["checkouts"])]
+            yield "counter", "musik_ytmusic_pool_waits_total", "Checkouts that waited for a free client", [
+                ("", pool["waits"])]
+            yield "counter", "musik_ytmusic_pool_wait_seconds_total", "Time spent waiting for a free client", [
+                ("", pool["wait_seconds"])]
+            yield "counter", "musik_ytmusic_pool_build_failures_total", "YTMusic clients that failed to build", [
+                ("", pool["failures"])]
+
+        breaker = upstream.breaker
+        yield "gauge", "musik_upstream_breaker_state", "Circuit breaker state (1 for the current one)", [
+            (_labels(("state",), (state,)), int(breaker.state == state))
+            for state in (breaker.CLOSED, breaker.OPEN, breaker.HALF_OPEN)]
+        yield "counter", "musik_upstream_breaker_opened_total", "Times the circuit breaker opened", [
+            ("", breaker.opened)]
+        yield "counter", "musik_upstream_short_circuited_total", "Calls failed fast by the open breaker", [
+            ("", breaker.short_circuited)]
+        yield "counter", "musik_upstream_retries_total", "YTMusic calls retried", [("", upstream.retried)]
+        yield "counter", "musik_upstream_rate_limited_total", "Calls rejected by the rate limiter", [
+            ("", upstream.limiter.throttled)]
+        if upstream.limiter.enabled:
+            yield "gauge", "musik_upstream_rate_limit", "Current upstream calls per second allowed", [
+                ("", upstream.limiter.rate)]
+
+        endpoints = cache["endpoints"]
+        backend = _labels(("backend",), (cache["backend"],))
+        if "entries" in cache:
+            yield "gauge", "musik_cache_entries", "Entries in the response cache", [(backend, cache["entries"])]
+        if "bytes" in cache:
+            yield "gauge", "musik_cache_bytes", "Estimated size of the response cache", [(backend, cache["bytes"])]
+        yield "gauge", "musik_cache_loads_in_flight", "Upstream loads being coalesced", [("", cache["in_flight"])]
+        yield "counter", "musik_cache_coalesced_total", "Requests that joined an in-flight load", [
+            ("", cache["coalesced"])]
+        for field, help in (
+            ("hits", "Cache hits by endpoint"),
+            ("misses", "Cache misses by endpoint"),
+            ("evictions", "Cache evictions by endpoint"),
+            ("expirations", "Cache expirations by endpoint"),
+            ("stale", "Stale entries served after upstream failures by endpoint"),
+        ):
+            yield "counter", f"musik_cache_{field}_total", help, [
+                (_labels(("endpoint",), (name,)), stats[field]) for name, stats in endpoints.items()]
+        yield "gauge", "musik_cache_hit_ratio", "Cache hit ratio by endpoint", [
+            (_labels(("endpoint",), (name,)), stats["hit_ratio"]) for name, stats in endpoints.items()]
+
+        index = services.search_index.stats()
+        yield "gauge", "musik_search_index_documents", "Tracks in the local search index", [
+            ("", index["documents"])]
+        yield "counter", "musik_search_index_queries_total", "Queries run against the local index", [
+            ("", index["queries"])]
+        yield "counter", "musik_search_index_answered_total", "Local index queries with hits", [
+            ("", index["answered"])]
+
+        prefetch = services.prefetcher.stats()
+        yield "gauge", "musik_prefetch_pending", "Queue items waiting to be prefetched", [
+            ("", prefetch["pending"])]
+        for field, help in (
+            ("scheduled", "Queue items scheduled for prefetch"),
+            ("warmed", "Queue items prefetched into the cache"),
+            ("skipped", "Queue items not prefetched because upstream was busy"),
+            ("failed", "Queue item prefetches that failed"),
+        ):
+            yield "counter", f"musik_prefetch_{field}_total", help, [("", prefetch[field])]
+
+        encoded = services.encoded.stats()
+        yield "counter", "musik_encoded_cache_hits_total", "Responses sent from already encoded bytes", [
+            ("", encoded["hits"])]
+        yield "counter", "musik_encoded_cache_misses_total", "Responses encoded into the encoded-body cache", [
+            ("", encoded["misses"])]
+
+        thumbs = services.thumbs.stats()
+        for field, help in (
+            ("hits", "Thumbnails served from the disk cache"),
+            ("misses", "Thumbnails that missed the disk cache"),
+            ("fetches", "Thumbnails fetched from i.ytimg.com"),
+            ("evictions", "Thumbnail blobs evicted from the disk cache"),
+        ):
+            yield "counter", f"musik_thumb_{field}_total", help, [("", thumbs[field])]
+        if thumbs["bytes"] is not None:
+            yield "gauge", "musik_thumb_cache_bytes", "Size of the thumbnail disk cache", [("", thumbs["bytes"])]
+
+    def render(self, services, cache):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        for kind, name, help, samples in self._collected(services, cache):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight count per route."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight.dec()
+            route = scope.get("route")
+            # Unmatched paths (404s, static files) share one label
+            path = getattr(route, "path", None) or "other"
+            metrics.observe_request(path, scope["method"], status, time.perf_counter() - start)
@@ -0,0 +1,96 @@
+"""Pre-serialized payloads with ETag and conditional GET support.
+
+Static-ish responses such as the home feed are encoded once (JSON and,
+when msgpack is installed, MessagePack; each plain and gzip) instead of
+on every request. ``PrecomputedPayload.response`` answers
+``If-None-Match`` with ``304 Not Modified`` and serves the negotiated
+format, gzipped for clients that accept it.
+"""
+
+import gzip
+import hashlib
+import logging
+
+from fastapi import Request, Response
+
+from core.wire import JSON, MEDIA_TYPES, MSGPACK, encode, encode_json, msgpack, negotiate
+
+logger = logging.getLogger(__name__)
+
+
+async def ndjson_lines(items, transform=None):
+    """Encode an async iterable as newline-delimited JSON, one object per line.
+
+    An upstream failure after the response has started cannot change the
+    status code any more. It is reported as a final ``{"error": ...}`` line.
+    """
+    try:
+        async for item in items:
+            if transform is not None:
+                item = transform(item)
+                if item is None:
+                    continue
+            yield encode_json(item) + b"\n"
+    except Exception as e:
+        logger.warning("NDJSON stream failed: %s", e)
+        yield encode_json({"error": str(e)}) + b"\n"
+
+
+def _etag_matches(header, etags):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+class PrecomputedPayload:
+    """A document kept as ready-to-send bytes in every format and encoding."""
+
+    def __init__(self, data, max_age=300, stale_while_revalidate=3600):
+        self.cache_control = (
+            f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+        )
+        self.update(data)
+
+    def update(self, data):
+        """Replace the document and re-encode it. Returns True if it changed."""
+        body = encode_json(data)
+        if getattr(self, "body", None) == body:
+            return False
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Build everything first, then swap, so readers never see a mix
+        variants = {}
+        for fmt in (JSON, MSGPACK) if msgpack is not None else (JSON,):
+            plain = body if fmt == JSON else encode(data, fmt)
+            tag = digest if fmt == JSON else f"{digest}-{fmt}"
+            variants[fmt] = (
+                (plain, f'"{tag}"'),
+                (gzip.compress(plain, compresslevel=9, mtime=0), f'"{tag}-gzip"'),
+            )
+        self.data = data
+        self.body = body
+        self.variants = variants
+        return True
+
+    def response(self, request: Request):
+        headers = {"Cache-Control": self.cache_control, "Vary": "Accept-Encoding, Accept"}
+        fmt = negotiate(request.headers.get("accept"))
+        plain, gzipped = self.variants[fmt]
+        gzip_ok = "gzip" in request.headers.get("accept-encoding", "")
+        body, etag = gzipped if gzip_ok else plain
+
+        if _etag_matches(request.headers.get("if-none-match"), (plain[1], gzipped[1])):
+            headers["ETag"] = etag
+            return Response(status_code=304, headers=headers)
+
+        headers["ETag"] = etag
+        if gzip_ok:
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, media_type=MEDIA_TYPES[fmt], headers=headers)
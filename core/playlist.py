@@ -0,0 +1,100 @@
+"""Windowed and streamed playlist loading.
+
+``ytmusicapi.get_playlist`` only takes a ``limit`` (100 tracks by default).
+Each playlist is therefore cached as one growing track list. A window
+(offset/limit) is sliced from that list, and upstream is called again only
+when a window reaches past what is cached. Each such call fetches up to the
+next 100-track boundary, so scrolling costs at most one upstream call per
+window and cached windows cost none. The streamed variant grows the list
+in doubling steps and sends only the new tracks of each step.
+"""
+
+from core import config
+from core.cache import make_key
+
+# ytmusicapi loads playlist tracks in pages of this size
+UPSTREAM_PAGE_SIZE = 100
+
+
+class PlaylistError(Exception):
+    status_code = 400
+
+
+def _header(playlist):
+    return {key: value for key, value in playlist.items() if key not in ("tracks", "related", "suggestions")}
+
+
+class PlaylistWindows:
+    """Serve playlist windows from one cached, growing track list per playlist."""
+
+    def __init__(self, cache, upstream, client, max_tracks=None):
+        self.cache = cache
+        self.upstream = upstream
+        self.client = client
+        self.max_tracks = max_tracks or config.PLAYLIST_MAX_TRACKS
+
+    async def _cached(self, key):
+        return await self.cache.get("playlist", key)
+
+    async def _ensure(self, playlist_id, needed):
+        key = make_key("playlist", playlist_id)
+        entry = await self._cached(key)
+        if entry is not None and (len(entry["playlist"]["tracks"]) >= needed or entry["exhausted"]):
+            return entry
+
+        async def fetch(limit):
+            playlist = await self.upstream.run(self.client.get_playlist, playlist_id, limit=limit)
+            tracks = playlist.get("tracks") or []
+            total = playlist.get("trackCount")
+            exhausted = (
+                len(tracks) < limit
+                or limit >= self.max_tracks
+                or (total is not None and len(tracks) >= int(total))
+            )
+            return {"playlist": playlist, "exhausted": exhausted}
+
+        return await self.cache.grow(
+            "playlist", key, needed, UPSTREAM_PAGE_SIZE, self.max_tracks, fetch,
+            lambda e: len(e["playlist"]["tracks"]),
+        )
+
+    async def window(self, playlist_id, offset=0, limit=UPSTREAM_PAGE_SIZE):
+        """Return the playlist header with ``tracks[offset:offset + limit]``."""
+        if offset < 0 or offset >= self.max_tracks:
+            raise PlaylistError(f"offset must be between 0 and {self.max_tracks - 1}")
+        limit = max(1, min(limit, self.max_tracks - offset))
+
+        entry = await self._ensure(playlist_id, offset + limit)
+        tracks = entry["playlist"]["tracks"]
+        window = tracks[offset:offset + limit]
+        end = offset + len(window)
+        more = end < len(tracks) or not entry["exhausted"]
+        return {
+            **_header(entry["playlist"]),
+            "tracks": window,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": end if window and more else None,
+        }
+
+    async def stream(self, playlist_id):
+        """Yield ``{"playlist": header}`` and then each track as its page arrives."""
+        sent = 0
+        step = UPSTREAM_PAGE_SIZE
+        entry = await self._cached(make_key("playlist", playlist_id))
+        if entry is None:
+            entry = await self._ensure(playlist_id, step)
+        yield {"playlist": _header(entry["playlist"])}
+
+        while True:
+            tracks = entry["playlist"]["tracks"]
+            for track in tracks[sent:]:
+                yield track
+            sent = len(tracks)
+            if entry["exhausted"]:
+                return
+            step = min(step * 2, self.max_tracks)
+            entry = await self._ensure(playlist_id, max(step, sent + 1))
+            if len(entry["playlist"]["tracks"]) <= sent and not entry["exhausted"]:
+                # Upstream returned nothing new; stop instead of looping
+                return
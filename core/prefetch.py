@@ -0,0 +1,120 @@
+"""Warm the caches for the tracks a client is about to play.
+
+When a queue is formed, the frontend posts the upcoming video ids to
+``/api/prefetch``. ``QueuePrefetcher`` resolves the stream info of the
+first few of them in the background. One ``get_song`` call fills both
+the ``stream`` and the ``song`` cache (see ``StreamResolver``). When the
+player moves on, ``/api/stream`` and ``/api/song`` are then answered from
+the cache.
+
+Prefetching is low priority. Only a couple of ids are fetched at a time.
+An item is dropped when the upstream pool is busy or the breaker is not
+closed, so prefetching never competes with requests someone is waiting
+on. Background work may not survive a serverless invocation, but nothing
+depends on it finishing.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from core import config
+from core.cache import make_key
+from core.stream import validate_video_id
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchRequest(BaseModel):
+    # The upcoming queue in play order; only the first ``depth`` ids are warmed
+    ids: List[str] = Field(..., min_length=1, max_length=config.BATCH_MAX_IDS)
+    depth: Optional[int] = Field(None, ge=1)
+
+
+class QueuePrefetcher:
+    """Resolve upcoming tracks in the background while upstream is idle."""
+
+    def __init__(self, streams, upstream, depth=None, concurrency=None, max_pending=None):
+        self.streams = streams
+        self.upstream = upstream
+        self.depth = depth or config.PREFETCH_DEPTH
+        self.max_pending = config.PREFETCH_MAX_PENDING if max_pending is None else max_pending
+        self._semaphore = asyncio.Semaphore(concurrency or config.PREFETCH_CONCURRENCY)
+        self._pending = set()
+        self._tasks = set()
+        self.scheduled = 0
+        self.warmed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def _cached(self, video_id):
+        return await self.streams.cache.peek(make_key("stream", video_id)) is not None
+
+    def _idle(self):
+        upstream = self.upstream
+        return (
+            upstream.breaker.state == upstream.breaker.CLOSED
+            and upstream.queue_depth == 0
+            and upstream.pending < max(1, upstream.max_workers // 2)
+        )
+
+    async def schedule(self, ids, depth=None):
+        """Start warming the next ``depth`` ids; returns what happened to each."""
+        report = {"scheduled": [], "cached": [], "skipped": [], "invalid": []}
+        limit = min(depth or self.depth, self.depth)
+        for video_id in list(dict.fromkeys(ids))[:limit]:
+            try:
+                validate_video_id(video_id)
+            except Exception:
+                report["invalid"].append(video_id)
+                continue
+            # The cache lookup awaits, so pending is checked after it to see ids scheduled meanwhile
+            if video_id not in self._pending and await self._cached(video_id):
+                report["cached"].append(video_id)
+            elif video_id in self._pending:
+                report["scheduled"].append(video_id)
+            elif len(self._pending) >= self.max_pending:
+                self.skipped += 1
+                report["skipped"].append(video_id)
+            else:
+                self._pending.add(video_id)
+                self.scheduled += 1
+                task = asyncio.ensure_future(self._warm(video_id))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                report["scheduled"].append(video_id)
+        return report
+
+    async def _warm(self, video_id):
+        try:
+            async with self._semaphore:
+                # Re-checked after waiting: the client may have asked for it meanwhile
+                if await self._cached(video_id):
+                    return
+                if not self._idle():
+                    self.skipped += 1
+                    return
+                await self.streams.resolve(video_id)
+                self.warmed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.debug("Prefetch of %s failed: %s", video_id, e)
+        finally:
+            self._pending.discard(video_id)
+
+    async def stop(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "scheduled": self.scheduled,
+            "warmed": self.warmed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
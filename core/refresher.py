@@ -0,0 +1,293 @@
+"""Background refresh of charts and the chart-driven home sections.
+
+Charts are the same for every user, so they are fetched off the request
+path and kept as per-country snapshots. Requests always get the last good
+snapshot. When a refresh fails, the previous snapshot stays in use.
+Snapshots older than the refresh interval are revalidated in the
+background when they are read (stale-while-revalidate). This keeps
+serverless deployments, which have no scheduler, reasonably fresh.
+
+When a cache is given, snapshots are also written to it. With a shared
+cache backend, other workers and later cold starts can reuse them.
+
+``get_many`` serves several countries in one request. Missing snapshots
+are fetched concurrently, at most ``CHARTS_CONCURRENCY`` at a time, and a
+country that fails does not fail the others. ``merge_charts`` combines
+the countries' track charts into one deduplicated regional ranking.
+"""
+
+import asyncio
+import copy
+import logging
+import re
+import time
+
+from core import config
+from core.cache import make_key
+from core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_COUNTRY = re.compile(r"^[A-Z]{2}$")
+
+
+class ChartsError(Exception):
+    status_code = 400
+
+
+def parse_countries(text, limit=None):
+    """Comma-separated ISO 3166 country codes, upper-cased and deduplicated."""
+    limit = limit or config.CHARTS_MAX_COUNTRIES
+    countries = list(dict.fromkeys(c.strip().upper() for c in (text or "").split(",") if c.strip()))
+    if not countries:
+        raise ChartsError("At least one country is required")
+    for country in countries:
+        if not _COUNTRY.match(country):
+            raise ChartsError(f"Invalid country code {country!r}")
+    if len(countries) > limit:
+        raise ChartsError(f"At most {limit} countries per request")
+    return countries
+
+
+def _thumbnail(item):
+    thumbnails = item.get("thumbnails") or []
+    return thumbnails[-1].get("url", "") if thumbnails else ""
+
+
+def _artist_names(item):
+    artists = item.get("artists") or []
+    return ", ".join(a.get("name", "") for a in artists if a.get("name")) or "Unknown"
+
+
+def chart_items(charts, kind):
+    """Return the item list of a chart section ("songs", "videos", "trending", "artists")."""
+    section = charts.get(kind) or {}
+    if isinstance(section, dict):
+        return section.get("items") or []
+    return section
+
+
+def track_cards(items, limit=8):
+    cards = []
+    for item in items:
+        video_id = item.get("videoId")
+        if not video_id:
+            continue
+        cards.append({
+            "id": video_id,
+            "title": item.get("title"),
+            "artist": _artist_names(item),
+            "thumbnail": _thumbnail(item) or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        })
+        if len(cards) == limit:
+            break
+    return cards
+
+
+def artist_cards(items, limit=8):
+    return [
+        {
+            "id": item.get("browseId"),
+            "title": item.get("title"),
+            "type": "Artis",
+            "thumbnail": _thumbnail(item),
+        }
+        for item in items[:limit]
+        if item.get("browseId")
+    ]
+
+
+def build_home_sections(base_sections, charts):
+    """Replace the chart-backed home sections with items from ``charts``."""
+    tracks = chart_items(charts, "songs") or chart_items(charts, "videos")
+    fills = {
+        "tangga_lagu": track_cards(tracks),
+        "hit_hari_ini": track_cards(chart_items(charts, "trending")),
+        "artis_populer": artist_cards(chart_items(charts, "artists")),
+    }
+
+    sections = copy.deepcopy(base_sections)
+    for section in sections:
+        items = fills.get(section.get("id"))
+        # Keep the curated items when the chart has nothing for this section
+        if items:
+            section["items"] = items
+    return sections
+
+
+def merge_charts(charts_by_country, limit=50):
+    """One ranking of the tracks charting in several countries.
+
+    Each country gives a track ``(n - rank + 1) / n`` points, where ``n`` is
+    the length of its chart, so every country weighs the same whatever its
+    chart length. Ties go to the track with the better best rank.
+    """
+    merged = {}
+    for country, charts in charts_by_country.items():
+        items = [item for item in chart_items(charts, "songs") or chart_items(charts, "videos") if item.get("videoId")]
+        for rank, item in enumerate(items, 1):
+            entry = merged.get(item["videoId"])
+            if entry is None:
+                entry = merged[item["videoId"]] = {**track_cards([item])[0], "score": 0.0, "ranks": {}}
+            entry["score"] += (len(items) - rank + 1) / len(items)
+            entry["ranks"][country] = rank
+
+    ranking = sorted(merged.values(), key=lambda e: (-e["score"], min(e["ranks"].values())))[:limit]
+    for entry in ranking:
+        entry["score"] = round(entry["score"], 4)
+    return ranking
+
+
+class ChartSnapshot:
+    __slots__ = ("country", "data", "fetched_at", "error")
+
+    def __init__(self, country, data, fetched_at):
+        self.country = country
+        self.data = data
+        self.fetched_at = fetched_at
+        self.error = None
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class ChartRefresher:
+    """Keeps per-country chart snapshots and the home feed up to date."""
+
+    def __init__(self, upstream, client, home_payload=None, base_sections=None,
+                 countries=None, interval=None, home_country=None, cache=None):
+        self.upstream = upstream
+        self.cache = cache
+        self.client = client
+        self.home_payload = home_payload
+        self.base_sections = base_sections
+        self.countries = list(countries or config.CHARTS_COUNTRIES)
+        self.interval = interval or config.CHARTS_REFRESH_INTERVAL
+        self.home_country = home_country or self.countries[0]
+        self.snapshots = {}
+        self.flights = SingleFlight()
+        self._task = None
+        self._background = set()
+
+    # ---------- reading ----------
+
+    async def snapshot(self, country):
+        """Return the snapshot for ``country``, fetching it only if never seen."""
+        country = country.upper()
+        snapshot = self.snapshots.get(country) or await self._restore(country)
+        if snapshot is None:
+            snapshot = await self.refresh(country, raise_errors=True)
+        elif snapshot.age > self.interval:
+            self._refresh_in_background(country)
+        return snapshot
+
+    async def get(self, country):
+        """Return the chart data for ``country``, fetching it only if never seen."""
+        return (await self.snapshot(country)).data
+
+    async def get_many(self, countries, concurrency=None):
+        """Return ``{country: snapshot or exception}``, fetching missing countries concurrently."""
+        semaphore = asyncio.Semaphore(concurrency or config.CHARTS_CONCURRENCY)
+
+        async def load(country):
+            async with semaphore:
+                return await self.snapshot(country)
+
+        results = await asyncio.gather(*(load(c) for c in countries), return_exceptions=True)
+        return dict(zip(countries, results))
+
+    async def touch(self):
+        """Revalidate stale snapshots of the configured countries without waiting for upstream."""
+        for country in self.countries:
+            snapshot = self.snapshots.get(country) or await self._restore(country)
+            if snapshot is None or snapshot.age > self.interval:
+                self._refresh_in_background(country)
+
+    async def _restore(self, country):
+        """Adopt a snapshot another worker (or a previous process) stored in the cache."""
+        if self.cache is None:
+            return None
+        stored = await self.cache.get("charts", make_key("charts", country))
+        if stored is None:
+            return None
+        snapshot = ChartSnapshot(country, stored["data"], stored["fetched_at"])
+        self.snapshots[country] = snapshot
+        if country == self.home_country:
+            self.rebuild_home()
+        return snapshot
+
+    # ---------- refreshing ----------
+
+    async def refresh(self, country, raise_errors=False):
+        country = country.upper()
+        try:
+            return await self.flights.do(country, lambda: self._fetch(country))
+        except Exception as e:
+            previous = self.snapshots.get(country)
+            if previous is not None:
+                previous.error = str(e)
+            logger.warning("Chart refresh for %s failed: %s", country, e)
+            if raise_errors:
+                raise
+            return previous
+
+    async def _fetch(self, country):
+        data = await self.upstream.run(self.client.get_charts, country=country)
+        snapshot = ChartSnapshot(country, data, time.time())
+        self.snapshots[country] = snapshot
+        if self.cache is not None:
+            await self.cache.set(
+                "charts", make_key("charts", country),
+                {"data": data, "fetched_at": snapshot.fetched_at},
+                ttl=config.CHARTS_SNAPSHOT_TTL,
+            )
+        if country == self.home_country:
+            self.rebuild_home()
+        return snapshot
+
+    async def refresh_all(self):
+        await asyncio.gather(*(self.refresh(c) for c in self.countries))
+
+    def rebuild_home(self):
+        snapshot = self.snapshots.get(self.home_country)
+        if self.home_payload is None or self.base_sections is None or snapshot is None:
+            return
+        sections = build_home_sections(self.base_sections, snapshot.data)
+        self.home_payload.update({"sections": sections})
+
+    def _refresh_in_background(self, country):
+        if country in self.flights:
+            return
+        task = asyncio.ensure_future(self.refresh(country))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    # ---------- scheduling ----------
+
+    async def _run(self):
+        while True:
+            await self.refresh_all()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self):
+        return {
+            country: {
+                "age": round(snapshot.age, 1),
+                "last_error": snapshot.error,
+            }
+            for country, snapshot in self.snapshots.items()
+        }
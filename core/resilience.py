@@ -0,0 +1,262 @@
+"""Rate limiting, retries and circuit breaking around upstream calls.
+
+``ResilientUpstream`` wraps ``UpstreamExecutor.run`` with three guards:
+
+* ``RateLimiter``: a token bucket that keeps calls under YouTube Music's
+  rate limits. Its rate is halved whenever upstream answers HTTP 429 and
+  creeps back up with every success.
+* ``RetryBudget``: failed calls are retried with jittered exponential
+  backoff, but retries may add at most a fixed share of extra load, so a
+  brownout is not amplified.
+* ``CircuitBreaker``: once too many calls in the recent window fail,
+  calls fail fast (503) instead of waiting on a struggling upstream.
+  After a cool-down one probe call is let through (half-open); its
+  result closes or re-opens the breaker.
+
+Client errors (HTTP 4xx other than 429) are neither retried nor counted
+as failures. Callers backed by the response cache serve stale entries
+while the breaker is open.
+
+Everything here runs on the event loop, so no locking is needed.
+"""
+
+import asyncio
+import collections
+import logging
+import math
+import random
+import re
+import time
+
+from core import config
+from core.upstream import UpstreamError, UpstreamOverloaded, UpstreamTimeout
+
+logger = logging.getLogger(__name__)
+
+_HTTP_STATUS = re.compile(r"HTTP (\d{3})")
+
+
+class UpstreamUnavailable(UpstreamError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    status_code = 503
+
+
+class UpstreamRateLimited(UpstreamOverloaded):
+    """Raised when no rate-limit token frees up in time."""
+
+    status_code = 503
+
+
+def upstream_status(error):
+    """Best-effort HTTP status of a failed ytmusicapi call, or ``None``."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return status
+    # ytmusicapi reports errors as "Server returned HTTP 429: Too Many Requests"
+    match = _HTTP_STATUS.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def is_client_error(error):
+    status = upstream_status(error)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+class RateLimiter:
+    """Token bucket whose rate adapts to upstream throttling (AIMD)."""
+
+    def __init__(self, rate=None, burst=None, max_wait=None, min_rate=None):
+        self.max_rate = config.UPSTREAM_RATE_LIMIT if rate is None else rate
+        self.rate = self.max_rate
+        self.min_rate = min_rate or max(self.max_rate / 16, 0.5)
+        self.burst = burst or config.UPSTREAM_RATE_BURST
+        self.max_wait = config.UPSTREAM_RATE_MAX_WAIT if max_wait is None else max_wait
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self.throttled = 0
+
+    @property
+    def enabled(self):
+        return self.max_rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if not self.enabled:
+            return
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            wait = (1 - self.tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                self.throttled += 1
+                raise UpstreamRateLimited("Upstream rate limit reached, try again later")
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        if self.enabled and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+    def on_throttled(self):
+        if self.enabled:
+            self.rate = max(self.min_rate, self.rate / 2)
+            logger.warning("Upstream throttled us; rate limit lowered to %.1f/s", self.rate)
+
+
+class RetryBudget:
+    """Allow at most ``ratio`` retries per call, with a small reserve."""
+
+    def __init__(self, ratio=None, reserve=10):
+        self.ratio = config.UPSTREAM_RETRY_BUDGET if ratio is None else ratio
+        self.reserve = reserve
+        self.balance = float(reserve)
+
+    def on_call(self):
+        self.balance = min(self.reserve, self.balance + self.ratio)
+
+    def try_spend(self):
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """Closed -> open on a high failure ratio -> half-open probe -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_ratio=None, min_calls=None, window=None, open_seconds=None):
+        self.failure_ratio = failure_ratio or config.BREAKER_FAILURE_RATIO
+        self.min_calls = min_calls or config.BREAKER_MIN_CALLS
+        self.window = window or config.BREAKER_WINDOW
+        self.open_seconds = open_seconds or config.BREAKER_OPEN_SECONDS
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.opened = 0
+        self.short_circuited = 0
+        self._probing = False
+        # (time, failed) for calls in the window
+        self._outcomes = collections.deque()
+        self._failures = 0
+
+    @property
+    def retry_after(self):
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self):
+        """Return True if a call may go upstream now."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and self.retry_after <= 0:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def release(self):
+        """Give back a probe slot whose call never reached upstream."""
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+
+    def _trim(self, now):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            _, failed = self._outcomes.popleft()
+            self._failures -= failed
+
+    def record(self, failed):
+        now = time.monotonic()
+        if self.state == self.HALF_OPEN and self._probing:
+            self._probing = False
+            if failed:
+                self._open(now)
+            else:
+                logger.info("Upstream recovered; circuit breaker closed")
+                self.state = self.CLOSED
+                self._outcomes.clear()
+                self._failures = 0
+            return
+        if self.state != self.CLOSED:
+            return
+
+        self._outcomes.append((now, failed))
+        self._failures += failed
+        self._trim(now)
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and self._failures / calls >= self.failure_ratio:
+            self._open(now)
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.opened += 1
+        logger.warning("Upstream failing; circuit breaker open for %gs", self.open_seconds)
+
+
+class ResilientUpstream:
+    """``UpstreamExecutor`` with rate limiting, retries and a circuit breaker."""
+
+    def __init__(self, executor, limiter=None, breaker=None, budget=None, retries=None, base_delay=None):
+        self.executor = executor
+        self.limiter = limiter or RateLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.budget = budget or RetryBudget()
+        self.retries = config.UPSTREAM_RETRIES if retries is None else retries
+        self.base_delay = config.UPSTREAM_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.retried = 0
+
+    def __getattr__(self, name):
+        # Pool gauges and counters (pending, queue_depth, ...) come from the executor
+        return getattr(self.executor, name)
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """Run ``fn(*args, **kwargs)`` upstream behind the guards."""
+        self.budget.on_call()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise UpstreamUnavailable(
+                    f"Upstream is unavailable, retry in {math.ceil(self.breaker.retry_after)}s"
+                )
+            try:
+                await self.limiter.acquire()
+                result = await self.executor.run(fn, *args, timeout=timeout, **kwargs)
+            except (UpstreamOverloaded, asyncio.CancelledError):
+                # Shed locally or abandoned; says nothing about upstream health
+                self.breaker.release()
+                raise
+            except Exception as e:
+                client_error = is_client_error(e)
+                self.breaker.record(not client_error)
+                if upstream_status(e) == 429:
+                    self.limiter.on_throttled()
+                retryable = not client_error and not isinstance(e, UpstreamTimeout)
+                if not retryable or attempt >= self.retries or not self.budget.try_spend():
+                    raise
+                attempt += 1
+                self.retried += 1
+                # Full jitter: a random delay up to the exponential backoff
+                await asyncio.sleep(random.uniform(0, self.base_delay * 2 ** attempt))
+            else:
+                self.breaker.record(False)
+                self.limiter.on_success()
+                return result
+
+    def status(self):
+        return {
+            "breaker": self.breaker.state,
+            "retry_after": round(self.breaker.retry_after, 1) if self.breaker.state != CircuitBreaker.CLOSED else 0,
+            "rate_limit": round(self.limiter.rate, 2) if self.limiter.enabled else None,
+        }
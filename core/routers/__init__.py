@@ -0,0 +1,16 @@
+"""API routers shared by both entry points, one module per endpoint group."""
+
+from core.routers import artist, charts, health, home, library, metrics, music, playlist, search, thumbs
+
+ROUTERS = (
+    home.router,
+    search.router,
+    music.router,
+    artist.router,
+    playlist.router,
+    charts.router,
+    thumbs.router,
+    library.router,
+    health.router,
+    metrics.router,
+)
@@ -0,0 +1,98 @@
+from typing import Optional
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from core import config
+from core.artist_page import parse_sections, section_records
+from core.batch import BatchRequest, fetch_batch
+from core.cache_policy import NO_STORE
+from core.routers.shaping import FIELDS_QUERY, RAW_QUERY, THUMB_QUERY, projection, shape_batch
+from core.schema import Album, Artist, RelatedArtist, SchemaError, Track
+from core.services import get_services
+from core.upstream import UpstreamError
+
+ARTIST_HEADER_FIELDS = "id,name,description,subscribers,thumbnail"
+
+router = APIRouter()
+
+
+@router.get("/api/artist/{channel_id}")
+async def get_artist_info(
+    channel_id: str,
+    fields: Optional[str] = FIELDS_QUERY,
+    thumb: Optional[str] = THUMB_QUERY,
+    raw: bool = RAW_QUERY,
+    services=Depends(get_services),
+):
+    """Get artist information"""
+    view = None if raw else projection(Artist, fields, thumb)
+    upstream, ytmusic = services.upstream, services.ytmusic
+    try:
+        artist_info = await services.cache.get_or_load(
+            "artist", (channel_id,), lambda: upstream.run(ytmusic.get_artist, channel_id)
+        )
+    except UpstreamError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return artist_info if view is None else view.apply(Artist.from_raw(artist_info, channel_id))
+
+
+@router.get("/api/artist/{channel_id}/page")
+async def get_artist_page(
+    channel_id: str,
+    response: Response,
+    sections: Optional[str] = Query(None, description="Comma-separated sections to load (default: all)"),
+    deadline_ms: Optional[int] = Query(None, ge=0, description="Milliseconds to wait for the sections"),
+    thumb: Optional[str] = THUMB_QUERY,
+    services=Depends(get_services),
+):
+    """Get an artist screen: header and full sections, late ones marked for lazy load"""
+    header_view = projection(Artist, ARTIST_HEADER_FIELDS, thumb)
+    views = {schema: projection(schema, None, thumb) for schema in (Track, Album, RelatedArtist)}
+    try:
+        names = parse_sections(sections)
+        artist, loaded = await services.artist_pages.build(
+            channel_id, names, None if deadline_ms is None else deadline_ms / 1000
+        )
+    except SchemaError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except UpstreamError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    page = {"artist": header_view.apply(Artist.from_raw(artist, channel_id)), "sections": {}}
+    for name, (status, items) in loaded.items():
+        section = {"status": status, "items": [views[type(r)].apply(r) for r in section_records(name, items)]}
+        if status == "pending":
+            query = {"sections": name, "deadline_ms": int(config.UPSTREAM_TIMEOUT * 1000)}
+            if thumb:
+                query["thumb"] = thumb
+            section["lazy"] = f"/api/artist/{channel_id}/page?{urlencode(query)}"
+        page["sections"][name] = section
+    if any(status in ("pending", "error") for status, _ in loaded.values()):
+        # Incomplete pages must not be reused as if they were whole
+        response.headers["Cache-Control"] = NO_STORE
+    return page
+
+
+@router.post("/api/artists/batch")
+async def get_artists_batch(
+    body: BatchRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    thumb: Optional[str] = THUMB_QUERY,
+    raw: bool = RAW_QUERY,
+    services=Depends(get_services),
+):
+    """Get information for many artists in one request"""
+    view = None if raw else projection(Artist, fields, thumb)
+    upstream, ytmusic = services.upstream, services.ytmusic
+    batch = await fetch_batch(
+        services.cache, "artist", body.ids,
+        lambda channel_id: upstream.run(ytmusic.get_artist, channel_id),
+    )
+    if view is None:
+        return batch
+    return shape_batch(batch, lambda channel_id, artist: view.apply(Artist.from_raw(artist, channel_id)))
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from core import fallback
+from core.cache_policy import NO_STORE
+from core.refresher import ChartsError, merge_charts, parse_countries
+from core.services import get_services
+from core.upstream import UpstreamOverloaded
+from core.wire import ApiResponse
+
+router = APIRouter()
+
+
+@router.get("/api/charts")
+async def get_charts(
+    response: Response,
+    country: str = "ID",
+    merge: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    services=Depends(get_services),
+):
+    """Get music charts for one country, or several (comma-separated) at once"""
+    try:
+        countries = parse_countries(country)
+    except ChartsError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    if len(countries) == 1 and not merge:
+        try:
+            data = await services.refresher.get(countries[0])
+        except UpstreamOverloaded as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        except Exception:
+            # Return mock charts data; clients must not keep it
+            response.headers["Cache-Control"] = NO_STORE
+            return fallback.charts()
+        # The same snapshot is served until the next refresh; encode it once per format
+        return ApiResponse(data, cache=services.encoded)
+
+    snapshots = await services.refresher.get_many(countries)
+    results = {}
+    for name, snapshot in snapshots.items():
+        if isinstance(snapshot, Exception):
+            results[name] = {"status": "error", "detail": str(snapshot), "data": None}
+            continue
+        results[name] = {
+            "status": "ok",
+            "fetched_at": round(snapshot.fetched_at, 3),
+            "age": round(snapshot.age, 1),
+            "stale": snapshot.age > services.refresher.interval,
+            "last_error": snapshot.error,
+            "data": snapshot.data,
+        }
+    body = {"countries": results}
+    if merge:
+        body["merged"] = merge_charts(
+            {name: result["data"] for name, result in results.items() if result["data"] is not None}, limit
+        )
+    if any(result["status"] == "error" for result in results.values()):
+        # Partial answers are retried on the next request rather than kept
+        response.headers["Cache-Control"] = NO_STORE
+    return body
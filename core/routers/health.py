@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends, Request
+
+from core.services import get_services
+
+router = APIRouter()
+
+
+@router.get("/api/health")
+async def health_check(request: Request, services=Depends(get_services)):
+    return {"status": "ok", "version": request.app.version, "upstream": services.upstream.status()}
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Request
+
+from core.services import get_services
+
+router = APIRouter()
+
+
+@router.get("/api/home")
+async def get_home_content(request: Request, services=Depends(get_services)):
+    """Get home page content"""
+    await services.refresher.touch()
+    return services.home_payload.response(request)
+
+
+@router.get("/api/categories")
+async def get_categories(request: Request, services=Depends(get_services)):
+    """Get browse categories"""
+    return services.categories_payload.response(request)
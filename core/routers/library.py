@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from core.library import LibraryError, SyncRequest
+from core.services import get_services
+from core.upstream import UpstreamError
+
+router = APIRouter()
+
+
+@router.post("/api/library/sync")
+async def sync_library(body: SyncRequest, services=Depends(get_services)):
+    """Store this device's library changes and return everyone else's since ``since``"""
+    try:
+        return await services.library.sync(body)
+    except (UpstreamError, LibraryError) as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
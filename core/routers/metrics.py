@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Response
+
+from core.metrics import CONTENT_TYPE
+from core.services import get_services
+
+router = APIRouter()
+
+
+@router.get("/api/metrics")
+async def get_metrics(services=Depends(get_services)):
+    """Prometheus metrics for this worker"""
+    # Shared cache backends are queried in a worker thread, so read the cache first
+    cache = await services.cache.snapshot()
+    return Response(services.metrics.render(services, cache), media_type=CONTENT_TYPE)
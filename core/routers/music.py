@@ -0,0 +1,80 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from core import fallback
+from core.cache_policy import NO_STORE
+from core.prefetch import PrefetchRequest
+from core.batch import BatchRequest, fetch_batch
+from core.routers.shaping import FIELDS_QUERY, RAW_QUERY, THUMB_QUERY, projection, shape_batch
+from core.schema import Track
+from core.services import get_services
+from core.stream import StreamError, validate_video_id, watch_url
+from core.upstream import UpstreamOverloaded
+
+router = APIRouter()
+
+
+@router.get("/api/song/{video_id}")
+async def get_song_info(
+    video_id: str,
+    response: Response,
+    fields: Optional[str] = FIELDS_QUERY,
+    thumb: Optional[str] = THUMB_QUERY,
+    raw: bool = RAW_QUERY,
+    services=Depends(get_services),
+):
+    """Get song information from YouTube Music"""
+    view = None if raw else projection(Track, fields, thumb)
+    upstream, ytmusic = services.upstream, services.ytmusic
+    try:
+        song_info = await services.cache.get_or_load(
+            "song", (video_id,), lambda: upstream.run(ytmusic.get_song, video_id)
+        )
+    except UpstreamOverloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception:
+        # Return mock data if API fails; clients must not keep it
+        response.headers["Cache-Control"] = NO_STORE
+        song_info = fallback.song(video_id)
+    return song_info if view is None else view.apply(Track.from_song(song_info))
+
+
+@router.get("/api/stream/{video_id}")
+async def get_stream_url(video_id: str, services=Depends(get_services)):
+    """Get stream URL for a song"""
+    try:
+        return await services.streams.resolve(video_id)
+    except StreamError as e:
+        # Bad ids and tracks without a playable stream; the watch URL would not play either
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception:
+        return {
+            "stream_url": watch_url(video_id),
+            "video_id": video_id
+        }
+
+
+@router.post("/api/songs/batch")
+async def get_songs_batch(
+    body: BatchRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    thumb: Optional[str] = THUMB_QUERY,
+    raw: bool = RAW_QUERY,
+    services=Depends(get_services),
+):
+    """Get information for many songs in one request"""
+    view = None if raw else projection(Track, fields, thumb)
+    upstream, ytmusic = services.upstream, services.ytmusic
+    batch = await fetch_batch(
+        services.cache, "song", body.ids,
+        lambda video_id: upstream.run(ytmusic.get_song, video_id),
+        validate=validate_video_id,
+    )
+    return batch if view is None else shape_batch(batch, lambda _, song: view.apply(Track.from_song(song)))
+
+
+@router.post("/api/prefetch", status_code=202)
+async def prefetch_queue(body: PrefetchRequest, services=Depends(get_services)):
+    """Warm stream and song caches for the next tracks in a play queue"""
+    return await services.prefetcher.schedule(body.ids, body.depth)
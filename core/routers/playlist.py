@@ -0,0 +1,59 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from core.payload import ndjson_lines
+from core.playlist import PlaylistError
+from core.routers.shaping import FIELDS_QUERY, RAW_QUERY, THUMB_QUERY, projection
+from core.schema import Playlist, Track
+from core.services import get_services
+from core.upstream import UpstreamError
+
+router = APIRouter()
+
+
+@router.get("/api/playlist/{playlist_id}")
+async def get_playlist(
+    playlist_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = FIELDS_QUERY,
+    thumb: Optional[str] = THUMB_QUERY,
+    raw: bool = RAW_QUERY,
+    services=Depends(get_services),
+):
+    """Get playlist information with a window of its tracks"""
+    view = None if raw else projection(Playlist, fields, thumb)
+    try:
+        window = await services.playlists.window(playlist_id, offset, limit)
+    except (UpstreamError, PlaylistError) as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return window if view is None else view.apply(Playlist.from_raw(window))
+
+
+@router.get("/api/playlist/{playlist_id}/stream")
+async def stream_playlist(
+    playlist_id: str,
+    thumb: Optional[str] = THUMB_QUERY,
+    raw: bool = RAW_QUERY,
+    services=Depends(get_services),
+):
+    """Stream playlist tracks as NDJSON, header line first"""
+    transform = None
+    if not raw:
+        header_fields = ",".join(f for f in Playlist.FIELDS if f not in ("tracks", "offset", "limit", "next_offset"))
+        header_view = projection(Playlist, header_fields, thumb)
+        track_view = projection(Track, None, thumb)
+
+        def transform(item):
+            if "playlist" in item:
+                return {"playlist": header_view.apply(Playlist.from_raw(item["playlist"]))}
+            return track_view.apply(Track.from_item(item))
+
+    return StreamingResponse(
+        ndjson_lines(services.playlists.stream(playlist_id), transform=transform),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from core import fallback
+from core.cache_policy import NO_STORE
+from core.payload import ndjson_lines
+from core.search import SearchError, format_search_result
+from core.services import get_services
+from core.upstream import UpstreamOverloaded
+
+router = APIRouter()
+
+
+@router.get("/api/search")
+async def search(
+    response: Response,
+    query: Optional[str] = Query(None, min_length=1),
+    filter: str = "songs",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    services=Depends(get_services),
+):
+    """Search for songs, artists, albums using ytmusicapi"""
+    try:
+        results, next_cursor, source = await services.searcher.page(query, filter, limit, cursor)
+        formatted_results = [r for r in map(format_search_result, results) if r]
+        return {"results": formatted_results, "next_cursor": next_cursor, "source": source}
+    except (UpstreamOverloaded, SearchError) as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception:
+        # Fallback to mock data if API fails; clients must not keep it
+        response.headers["Cache-Control"] = NO_STORE
+        return {"results": fallback.search_results(query or ""), "next_cursor": None}
+
+
+@router.get("/api/search/stream")
+async def search_stream(
+    query: Optional[str] = Query(None, min_length=1),
+    filter: str = "songs",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    services=Depends(get_services),
+):
+    """Stream search results as NDJSON, one result per line"""
+    searcher = services.searcher
+    try:
+        searcher.resolve(query, filter, limit, cursor)
+    except SearchError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return StreamingResponse(
+        ndjson_lines(searcher.stream(query, filter, limit, cursor), transform=format_search_result),
+        media_type="application/x-ndjson",
+    )
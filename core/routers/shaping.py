@@ -0,0 +1,26 @@
+"""Query parameters and helpers for compact (projected) responses."""
+
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from core.schema import Projection, SchemaError
+
+FIELDS_QUERY = Query(None, description="Comma-separated fields to keep, e.g. id,title,thumbnail")
+THUMB_QUERY = Query(None, description="Thumbnail size: small, medium, large, max or a width in pixels")
+RAW_QUERY = Query(False, description="Return the unmodified ytmusicapi response")
+
+
+def projection(schema, fields: Optional[str], thumb: Optional[str]):
+    try:
+        return Projection(schema, fields, thumb)
+    except SchemaError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+def shape_batch(batch, project):
+    """Apply ``project(id, value)`` to every result of a ``fetch_batch`` response."""
+    return {
+        "results": {item_id: project(item_id, value) for item_id, value in batch["results"].items()},
+        "errors": batch["errors"],
+    }
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from core.routers.shaping import THUMB_QUERY
+from core.schema import SchemaError, parse_thumb
+from core.services import get_services
+from core.stream import InvalidVideoId
+from core.thumbs import CACHE_CONTROL, ThumbnailError
+
+router = APIRouter()
+
+
+@router.get("/api/thumb/{video_id}")
+async def get_thumbnail(
+    video_id: str,
+    request: Request,
+    thumb: Optional[str] = THUMB_QUERY,
+    services=Depends(get_services),
+):
+    """Get a cached, resized video thumbnail (WebP when accepted)"""
+    try:
+        width = parse_thumb(thumb)
+        webp = "image/webp" in request.headers.get("accept", "")
+        body, content_type, digest = await services.thumbs.get(video_id, width, webp)
+    except (SchemaError, InvalidVideoId, ThumbnailError) as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": f'"{digest[:32]}"', "Vary": "Accept"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=content_type, headers=headers)
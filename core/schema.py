@@ -0,0 +1,346 @@
+"""Compact response schemas for songs, artists, albums and playlists.
+
+ytmusicapi returns large nested dicts (streaming formats, microformat,
+thumbnails at every resolution) that the frontend never reads. The cache
+keeps those raw dicts, because other parts of the app need them. Responses
+are converted to the small ``__slots__`` records below, and ``Projection``
+serializes them. A projection keeps only the requested ``fields`` and one
+thumbnail URL closest to the requested size. A ``get_song`` payload
+shrinks from tens of kilobytes to a few hundred bytes.
+
+``fields`` is a comma-separated list. A dotted name selects fields of
+nested records, e.g. ``title,tracks.id,tracks.title``.
+"""
+
+THUMB_SIZES = {"small": 60, "medium": 226, "large": 544}
+DEFAULT_THUMB = "medium"
+
+
+class SchemaError(Exception):
+    status_code = 400
+
+
+# ============== PARSING HELPERS ==============
+
+def thumbnails_of(item):
+    """Return the thumbnail list of any upstream item shape."""
+    if item.get("thumbnails"):
+        return item["thumbnails"]
+    thumbnail = item.get("thumbnail")
+    if isinstance(thumbnail, dict):
+        return thumbnail.get("thumbnails") or []
+    if isinstance(thumbnail, list):
+        return thumbnail
+    if isinstance(thumbnail, str) and thumbnail:
+        return [{"url": thumbnail}]
+    return []
+
+
+def pick_thumbnail(thumbnails, width):
+    """The smallest thumbnail at least ``width`` wide, else the largest one."""
+    if not thumbnails:
+        return None
+    ranked = sorted(thumbnails, key=lambda t: t.get("width") or 0)
+    if width is None:
+        return ranked[-1].get("url")
+    for thumbnail in ranked:
+        if (thumbnail.get("width") or 0) >= width:
+            return thumbnail.get("url")
+    return ranked[-1].get("url")
+
+
+def parse_thumb(thumb):
+    """Turn a ``thumb`` query value (name or pixel width) into a width; ``None`` means largest."""
+    thumb = (thumb or DEFAULT_THUMB).strip().lower()
+    if thumb == "max":
+        return None
+    if thumb in THUMB_SIZES:
+        return THUMB_SIZES[thumb]
+    if thumb.isdigit() and 0 < int(thumb) <= 4096:
+        return int(thumb)
+    raise SchemaError(f"thumb must be one of {', '.join(THUMB_SIZES)}, max or a width in pixels")
+
+
+def parse_duration(item):
+    seconds = item.get("duration_seconds") or item.get("lengthSeconds")
+    if seconds:
+        return int(seconds)
+    text = item.get("duration")
+    if isinstance(text, str) and text:
+        total = 0
+        for part in text.split(":"):
+            if not part.isdigit():
+                return None
+            total = total * 60 + int(part)
+        return total
+    return None
+
+
+def _refs(items):
+    return [Ref(a.get("id") or a.get("browseId"), a.get("name")) for a in items or [] if isinstance(a, dict)]
+
+
+def section_items(section):
+    """The items of an artist page section (``{"results": [...]}``) or a plain list."""
+    if isinstance(section, dict):
+        return section.get("results") or []
+    return section or []
+
+
+# ============== SCHEMAS ==============
+
+class Record:
+    """Base for compact records; ``FIELDS`` lists what ``fields=`` may select."""
+
+    __slots__ = ()
+    FIELDS = ()
+    # field -> record class of the nested values
+    NESTED = {}
+
+    def value(self, name, width):
+        # "thumbnail" is the one URL of ``thumbnails`` closest to the requested width
+        if name == "thumbnail":
+            return pick_thumbnail(self.thumbnails, width)
+        return getattr(self, name)
+
+
+class Ref(Record):
+    __slots__ = ("id", "name")
+    FIELDS = __slots__
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class Track(Record):
+    __slots__ = ("id", "title", "artists", "album", "duration", "thumbnails", "explicit")
+    FIELDS = ("id", "title", "artist", "artists", "album", "duration", "thumbnail", "explicit")
+    NESTED = {"artists": Ref, "album": Ref}
+
+    def __init__(self, id, title, artists, album, duration, thumbnails, explicit):
+        self.id = id
+        self.title = title
+        self.artists = artists
+        self.album = album
+        self.duration = duration
+        self.thumbnails = thumbnails
+        self.explicit = explicit
+
+    @classmethod
+    def from_song(cls, song):
+        """From a ``get_song`` response (or a plain item as a fallback)."""
+        details = song.get("videoDetails")
+        if not details:
+            return cls.from_item(song)
+        return cls(
+            details.get("videoId"),
+            details.get("title"),
+            [Ref(details.get("channelId"), details.get("author"))],
+            None,
+            parse_duration(details),
+            thumbnails_of(details),
+            False,
+        )
+
+    @classmethod
+    def from_item(cls, item):
+        """From a search, playlist, album or artist track item."""
+        artists = _refs(item.get("artists"))
+        if not artists and item.get("artist"):
+            artists = [Ref(None, item["artist"])]
+        album = item.get("album")
+        return cls(
+            item.get("videoId") or item.get("id"),
+            item.get("title"),
+            artists,
+            Ref(album.get("id"), album.get("name")) if isinstance(album, dict) else None,
+            parse_duration(item),
+            thumbnails_of(item),
+            bool(item.get("isExplicit")),
+        )
+
+    def value(self, name, width):
+        if name == "artist":
+            return ", ".join(a.name for a in self.artists if a.name)
+        return super().value(name, width)
+
+
+class Album(Record):
+    __slots__ = ("id", "title", "type", "year", "thumbnails", "explicit")
+    FIELDS = ("id", "title", "type", "year", "thumbnail", "explicit")
+
+    def __init__(self, id, title, type, year, thumbnails, explicit):
+        self.id = id
+        self.title = title
+        self.type = type
+        self.year = year
+        self.thumbnails = thumbnails
+        self.explicit = explicit
+
+    @classmethod
+    def from_item(cls, item, type="album"):
+        return cls(
+            item.get("browseId"),
+            item.get("title"),
+            item.get("type") or type,
+            item.get("year"),
+            thumbnails_of(item),
+            bool(item.get("isExplicit")),
+        )
+
+
+class RelatedArtist(Record):
+    __slots__ = ("id", "name", "subscribers", "thumbnails")
+    FIELDS = ("id", "name", "subscribers", "thumbnail")
+
+    def __init__(self, id, name, subscribers, thumbnails):
+        self.id = id
+        self.name = name
+        self.subscribers = subscribers
+        self.thumbnails = thumbnails
+
+    @classmethod
+    def from_item(cls, item):
+        return cls(item.get("browseId"), item.get("title"), item.get("subscribers"), thumbnails_of(item))
+
+
+class Artist(Record):
+    __slots__ = ("id", "name", "description", "subscribers", "thumbnails", "songs", "albums", "singles", "videos", "related")
+    FIELDS = ("id", "name", "description", "subscribers", "thumbnail", "songs", "albums", "singles", "videos", "related")
+    NESTED = {"songs": Track, "albums": Album, "singles": Album, "videos": Track, "related": RelatedArtist}
+
+    def __init__(self, id, name, description, subscribers, thumbnails, songs, albums, singles, videos, related):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.subscribers = subscribers
+        self.thumbnails = thumbnails
+        self.songs = songs
+        self.albums = albums
+        self.singles = singles
+        self.videos = videos
+        self.related = related
+
+    @classmethod
+    def from_raw(cls, artist, channel_id=None):
+        return cls(
+            artist.get("channelId") or channel_id,
+            artist.get("name"),
+            artist.get("description"),
+            artist.get("subscribers"),
+            thumbnails_of(artist),
+            [Track.from_item(t) for t in section_items(artist.get("songs"))],
+            [Album.from_item(a) for a in section_items(artist.get("albums"))],
+            [Album.from_item(a, "single") for a in section_items(artist.get("singles"))],
+            [Track.from_item(v) for v in section_items(artist.get("videos"))],
+            [RelatedArtist.from_item(r) for r in section_items(artist.get("related"))],
+        )
+
+
+class Playlist(Record):
+    __slots__ = (
+        "id", "title", "author", "description", "year", "duration", "track_count", "thumbnails",
+        "tracks", "offset", "limit", "next_offset",
+    )
+    FIELDS = (
+        "id", "title", "author", "description", "year", "duration", "track_count", "thumbnail",
+        "tracks", "offset", "limit", "next_offset",
+    )
+    NESTED = {"author": Ref, "tracks": Track}
+
+    def __init__(self, id, title, author, description, year, duration, track_count, thumbnails,
+                 tracks, offset=None, limit=None, next_offset=None):
+        self.id = id
+        self.title = title
+        self.author = author
+        self.description = description
+        self.year = year
+        self.duration = duration
+        self.track_count = track_count
+        self.thumbnails = thumbnails
+        self.tracks = tracks
+        self.offset = offset
+        self.limit = limit
+        self.next_offset = next_offset
+
+    @classmethod
+    def from_raw(cls, playlist):
+        """From a ``get_playlist`` response or a ``PlaylistWindows`` window/header."""
+        author = playlist.get("author")
+        if isinstance(author, list):
+            author = author[0] if author else None
+        return cls(
+            playlist.get("id"),
+            playlist.get("title"),
+            Ref(author.get("id"), author.get("name")) if isinstance(author, dict) else None,
+            playlist.get("description"),
+            playlist.get("year"),
+            playlist.get("duration"),
+            playlist.get("trackCount"),
+            thumbnails_of(playlist),
+            [Track.from_item(t) for t in playlist.get("tracks") or []],
+            playlist.get("offset"),
+            playlist.get("limit"),
+            playlist.get("next_offset"),
+        )
+
+
+# ============== PROJECTION ==============
+
+def parse_fields(text):
+    """``"title,tracks.id"`` -> ``{"title": None, "tracks": {"id": None}}`` (None = everything)."""
+    tree = {}
+    for path in (text or "").split(","):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is None:
+                child = node[part] = {}
+            node = child
+        node.setdefault(parts[-1], None)
+    return tree or None
+
+
+def _validate(schema, tree, prefix=""):
+    for name, sub in tree.items():
+        if name not in schema.FIELDS:
+            raise SchemaError(f"Unknown field {prefix + name!r}; available: {', '.join(schema.FIELDS)}")
+        if sub is not None:
+            nested = schema.NESTED.get(name)
+            if nested is None:
+                raise SchemaError(f"Field {prefix + name!r} has no sub-fields")
+            _validate(nested, sub, f"{prefix}{name}.")
+
+
+class Projection:
+    """Validated ``fields``/``thumb`` selection that turns records into dicts."""
+
+    def __init__(self, schema, fields=None, thumb=None):
+        self.schema = schema
+        self.width = parse_thumb(thumb)
+        self.tree = parse_fields(fields)
+        if self.tree is not None:
+            _validate(schema, self.tree)
+
+    def _render(self, record, tree):
+        if record is None:
+            return None
+        names = record.FIELDS if tree is None else tree
+        out = {}
+        for name in names:
+            value = record.value(name, self.width)
+            sub = None if tree is None else tree[name]
+            if isinstance(value, list):
+                value = [self._render(v, sub) if isinstance(v, Record) else v for v in value]
+            elif isinstance(value, Record):
+                value = self._render(value, sub)
+            out[name] = value
+        return out
+
+    def apply(self, record):
+        return self._render(record, self.tree)
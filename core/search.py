@@ -0,0 +1,180 @@
+"""Paginated and streamed search.
+
+ytmusicapi follows search continuations internally and only exposes a
+``limit``. Pages are therefore served from one cached, growing result list
+per (query, filter). A later page extends that list upstream only when it
+reaches past what is already cached. Cursors are opaque tokens that
+encode the query, filter and offset.
+
+With a ``LocalSearchIndex``, a first page of song results is answered
+from tracks the server has already seen, when the index has enough hits.
+Cursors always continue with upstream results. The cursor after a local
+page carries the ids it sent, and later pages skip them.
+"""
+
+import base64
+import json
+
+from core import config
+from core.cache import make_key, normalize_query, round_up
+
+SEARCH_FILTERS = ("songs", "videos", "albums", "artists", "playlists")
+
+# ytmusicapi fetches results in pages of about this size
+UPSTREAM_PAGE_SIZE = 20
+
+
+class SearchError(Exception):
+    status_code = 400
+
+
+def encode_cursor(query, filter, offset, skip=()):
+    data = {"q": query, "f": filter, "o": offset}
+    if skip:
+        # Ids already sent from the local index, left out of upstream pages
+        data["s"] = list(skip)
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        skip = data.get("s") or []
+        if not isinstance(skip, list) or len(skip) > 100 or not all(isinstance(i, str) for i in skip):
+            raise ValueError("bad skip list")
+        return data["q"], data["f"], int(data["o"]), skip
+    except Exception:
+        raise SearchError("Invalid cursor")
+
+
+def format_search_result(item):
+    """Flatten a ytmusicapi search result for the frontend, or ``None``."""
+    item_id = item.get("videoId") or item.get("browseId") or item.get("playlistId")
+    if not item_id:
+        return None
+    return {
+        "id": item_id,
+        "type": item.get("resultType"),
+        "title": item.get("title") or item.get("artist"),
+        "artist": item.get("artists", [{}])[0].get("name", "Unknown") if item.get("artists") else "Unknown",
+        "thumbnail": item.get("thumbnails", [{}])[-1].get("url", "") if item.get("thumbnails") else "",
+        "duration": item.get("duration"),
+        "album": item.get("album", {}).get("name") if item.get("album") else None
+    }
+
+
+class SearchPager:
+    """Serve search results page by page from a shared, growing result list."""
+
+    def __init__(self, cache, upstream, client, index=None, max_results=None, min_local=None):
+        self.cache = cache
+        self.upstream = upstream
+        self.client = client
+        self.index = index
+        self.max_results = max_results or config.SEARCH_MAX_RESULTS
+        self.min_local = config.LOCAL_SEARCH_MIN_RESULTS if min_local is None else min_local
+
+    def resolve(self, query, filter, limit, cursor=None):
+        """Validate arguments and return ``(query, filter, offset, limit, skip)``."""
+        offset = 0
+        skip = []
+        if cursor:
+            query, filter, offset, skip = decode_cursor(cursor)
+        if not query or not query.strip():
+            raise SearchError("Query must not be empty")
+        if filter not in SEARCH_FILTERS:
+            raise SearchError(f"filter must be one of: {', '.join(SEARCH_FILTERS)}")
+        if offset < 0 or offset >= self.max_results:
+            raise SearchError("Cursor is past the end of the results")
+        limit = max(1, min(limit, self.max_results - offset))
+        return query, filter, offset, limit, skip
+
+    def _local(self, query, filter, limit, cursor):
+        if self.index is None or cursor or filter != "songs":
+            return []
+        return self.index.search(query, limit)
+
+    async def _cached(self, key):
+        return await self.cache.get("search", key) or {"items": [], "exhausted": False}
+
+    async def _ensure(self, query, filter, needed):
+        """Return the cached entry extended to at least ``needed`` results when possible."""
+        key = make_key("search", normalize_query(query), filter)
+        entry = await self._cached(key)
+        if len(entry["items"]) >= needed or entry["exhausted"]:
+            return entry
+
+        async def fetch(limit):
+            items = await self.upstream.run(self.client.search, query, filter=filter, limit=limit)
+            return {"items": items, "exhausted": len(items) < limit}
+
+        return await self.cache.grow(
+            "search", key, needed, UPSTREAM_PAGE_SIZE, self.max_results, fetch, lambda e: len(e["items"])
+        )
+
+    async def page(self, query, filter="songs", limit=20, cursor=None):
+        """Return ``(items, next_cursor, source)`` for one page."""
+        query, filter, offset, limit, skip = self.resolve(query, filter, limit, cursor)
+
+        local = self._local(query, filter, limit, cursor)
+        if local and len(local) >= min(limit, self.min_local):
+            return local, encode_cursor(query, filter, 0, [item["videoId"] for item in local]), "local"
+
+        # Skipped ids may all fall into this page; fetch far enough to fill it anyway
+        entry = await self._ensure(query, filter, offset + limit + len(skip))
+        skip = set(skip)
+        items = []
+        end = offset
+        for item in entry["items"][offset:]:
+            if len(items) >= limit:
+                break
+            end += 1
+            if item.get("videoId") not in skip:
+                items.append(item)
+
+        more = end < len(entry["items"]) or not entry["exhausted"]
+        next_cursor = None
+        if items and more and end < self.max_results:
+            next_cursor = encode_cursor(query, filter, end, sorted(skip))
+        return items, next_cursor, "upstream"
+
+    async def stream(self, query, filter="songs", limit=20, cursor=None):
+        """Yield results as soon as they are available.
+
+        Local index hits come first, then cached upstream results, then the
+        upstream page holding the offset on its own, so it can be flushed
+        before the (slower) full request finishes. Tracks already sent are
+        skipped.
+        """
+        query, filter, offset, limit, skip = self.resolve(query, filter, limit, cursor)
+        end = offset + limit + len(skip)
+        seen = set(skip)
+        emitted = 0
+
+        for item in self._local(query, filter, limit, cursor):
+            seen.add(item["videoId"])
+            emitted += 1
+            yield item
+
+        pos = offset
+        entry = await self._cached(make_key("search", normalize_query(query), filter))
+        targets = (len(entry["items"]), min(end, round_up(offset + 1, UPSTREAM_PAGE_SIZE)), end)
+        for stage, target in enumerate(targets):
+            if emitted >= limit or pos >= end:
+                return
+            if stage > 0:
+                if entry["exhausted"]:
+                    return
+                if target <= pos:
+                    continue
+                entry = await self._ensure(query, filter, target)
+            for item in entry["items"][pos:min(target, end)]:
+                pos += 1
+                if item.get("videoId") in seen:
+                    continue
+                emitted += 1
+                yield item
+                if emitted >= limit:
+                    return
@@ -0,0 +1,247 @@
+"""Local full-text index over tracks the server has already fetched.
+
+Every song that passes through the response cache is indexed, whether it
+came from search results, charts, playlists, artist pages, ``get_song``
+or the home feed. Titles and artist names are diacritic- and case-folded
+("Sámsons" matches "samsons"). Every query term matches as a prefix, so
+type-ahead works. Terms with no prefix match fall back to trigram
+similarity, which tolerates small typos.
+
+The index lives in process memory and is touched only from the event loop.
+"""
+
+import bisect
+import heapq
+import itertools
+import re
+import unicodedata
+from collections import OrderedDict
+
+from core import config
+from core.schema import thumbnails_of
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+# Prefix matches stop after this many tokens, so one-letter queries stay cheap
+MAX_PREFIX_TOKENS = 2000
+# Broad queries are ranked over at most this many of their matches
+MAX_SCORED = 500
+# Minimum share of trigrams a token must have in common with a misspelled term
+TRIGRAM_THRESHOLD = 0.5
+
+
+def fold(text):
+    """Lower-case and strip diacritics and punctuation."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+def tokenize(text):
+    return fold(text).split()
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def to_track(item):
+    """Convert any track-like upstream dict to a search-result-shaped dict, or ``None``."""
+    if not isinstance(item, dict):
+        return None
+    details = item.get("videoDetails")
+    if details:
+        # get_song response
+        return {
+            "resultType": "song",
+            "videoId": details.get("videoId"),
+            "title": details.get("title"),
+            "artists": [{"name": details.get("author"), "id": details.get("channelId")}],
+            "album": None,
+            "duration_seconds": int(details.get("lengthSeconds") or 0) or None,
+            "thumbnails": thumbnails_of(details),
+        }
+
+    video_id = item.get("videoId")
+    if not video_id and _VIDEO_ID.match(str(item.get("id") or "")) and item.get("artist"):
+        # Home feed card
+        video_id = item["id"]
+    if not video_id or not item.get("title"):
+        return None
+
+    artists = item.get("artists")
+    if not artists and item.get("artist"):
+        artists = [{"name": item["artist"], "id": None}]
+    return {
+        "resultType": "song",
+        "videoId": video_id,
+        "title": item.get("title"),
+        "artists": artists or [],
+        "album": item.get("album"),
+        "duration": item.get("duration"),
+        "thumbnails": thumbnails_of(item),
+    }
+
+
+def tracks_in(endpoint, value):
+    """Yield the track-like dicts contained in a cached response."""
+    if endpoint == "search":
+        yield from value.get("items", [])
+    elif endpoint == "song":
+        yield value
+    elif endpoint == "playlist":
+        yield from (value.get("playlist") or {}).get("tracks") or []
+    elif endpoint == "charts":
+        data = value.get("data") or {}
+        for kind in ("songs", "videos", "trending"):
+            section = data.get(kind) or {}
+            yield from (section.get("items") if isinstance(section, dict) else section) or []
+    elif endpoint == "artist":
+        for kind in ("songs", "videos"):
+            yield from (value.get(kind) or {}).get("results") or []
+
+
+class LocalSearchIndex:
+    """Inverted index with prefix and trigram matching, bounded by document count."""
+
+    def __init__(self, max_docs=None):
+        self.max_docs = max_docs or config.LOCAL_INDEX_MAX_DOCS
+        # video id -> (track, title tokens, all tokens); oldest first
+        self.docs = OrderedDict()
+        self.postings = {}
+        self._tokens = []
+        self._trigrams = {}
+        self.queries = 0
+        self.answered = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    # ---------- indexing ----------
+
+    def add(self, item):
+        track = to_track(item)
+        if track is None:
+            return
+        video_id = track["videoId"]
+        if video_id in self.docs:
+            self._remove(video_id)
+
+        title_tokens = set(tokenize(track["title"]))
+        artist_text = " ".join(a.get("name") or "" for a in track["artists"] if isinstance(a, dict))
+        tokens = title_tokens | set(tokenize(artist_text))
+        if not tokens:
+            return
+
+        self.docs[video_id] = (track, title_tokens, tokens)
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+                bisect.insort(self._tokens, token)
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            posting.add(video_id)
+
+        while len(self.docs) > self.max_docs:
+            self._remove(next(iter(self.docs)))
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def ingest(self, endpoint, value):
+        """Cache listener: index every track inside a freshly stored response."""
+        if isinstance(value, dict):
+            self.add_many(tracks_in(endpoint, value))
+
+    def _remove(self, video_id):
+        _, _, tokens = self.docs.pop(video_id)
+        for token in tokens:
+            posting = self.postings[token]
+            posting.discard(video_id)
+            if not posting:
+                del self.postings[token]
+                self._tokens.pop(bisect.bisect_left(self._tokens, token))
+                for gram in trigrams(token):
+                    grams = self._trigrams[gram]
+                    grams.discard(token)
+                    if not grams:
+                        del self._trigrams[gram]
+
+    # ---------- querying ----------
+
+    def _prefix_tokens(self, term):
+        start = bisect.bisect_left(self._tokens, term)
+        end = min(len(self._tokens), start + MAX_PREFIX_TOKENS)
+        for token in self._tokens[start:end]:
+            if not token.startswith(term):
+                break
+            yield token
+
+    def _similar_tokens(self, term):
+        grams = trigrams(term)
+        counts = {}
+        for gram in grams:
+            for token in self._trigrams.get(gram, ()):
+                counts[token] = counts.get(token, 0) + 1
+        return [
+            token for token, shared in counts.items()
+            if shared / len(grams | trigrams(token)) >= TRIGRAM_THRESHOLD
+        ]
+
+    def _match(self, term):
+        """Return the set of documents matching ``term`` (shared, do not mutate)."""
+        tokens = list(self._prefix_tokens(term))
+        if not tokens and len(term) >= 3:
+            tokens = self._similar_tokens(term)
+        if len(tokens) == 1:
+            return self.postings[tokens[0]]
+        matched = set()
+        for token in tokens:
+            matched |= self.postings[token]
+        return matched
+
+    def search(self, query, limit=20):
+        """Return up to ``limit`` tracks matching every term of ``query``."""
+        self.queries += 1
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        # Intersect starting from the most selective term
+        matches = sorted((self._match(term) for term in set(terms)), key=len)
+        candidates = matches[0]
+        for matched in matches[1:]:
+            candidates = candidates & matched
+            if not candidates:
+                break
+        if not candidates:
+            return []
+
+        docs = self.docs
+
+        def score(video_id):
+            # Whole-word hits beat prefix hits, title hits beat artist hits,
+            # shorter titles beat longer ones
+            _, title_tokens, tokens = docs[video_id]
+            return (
+                sum(t in tokens for t in terms),
+                sum(t in title_tokens for t in terms),
+                -len(title_tokens),
+            )
+
+        ranked = heapq.nlargest(limit, itertools.islice(candidates, MAX_SCORED), key=score)
+        if ranked:
+            self.answered += 1
+        return [self.docs[video_id][0] for video_id in ranked]
+
+    def stats(self):
+        return {
+            "documents": len(self.docs),
+            "tokens": len(self._tokens),
+            "queries": self.queries,
+            "answered": self.answered,
+        }
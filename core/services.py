@@ -0,0 +1,103 @@
+"""The objects every router shares, built once per app.
+
+``Services`` wires the upstream pool, the response cache and the services
+built on top of them, so both entry points get the same stack. Routers
+reach it through the ``get_services`` dependency.
+"""
+
+from fastapi import Request
+
+from core.artist_page import ArtistPage
+from core.cache import ResponseCache
+from core.client import ClientPool
+from core.library import Library
+from core.metrics import Metrics
+from core.payload import PrecomputedPayload
+from core.playlist import PlaylistWindows
+from core.prefetch import QueuePrefetcher
+from core.refresher import ChartRefresher
+from core.resilience import ResilientUpstream
+from core.search import SearchPager
+from core.search_index import LocalSearchIndex
+from core.snapshot import load_snapshot
+from core.stream import StreamResolver
+from core.thumbs import ThumbnailProxy
+from core.upstream import UpstreamExecutor
+from core.wire import EncodedCache
+
+
+class Services:
+    """Upstream access, caching and precomputed payloads for one app."""
+
+    def __init__(self, client=None, snapshot=None):
+        # YTMusic clients are imported and built on first upstream use, not at startup;
+        # each call borrows one from the pool
+        self.ytmusic = client or ClientPool()
+
+        # Request, upstream and cache metrics served at /api/metrics
+        self.metrics = Metrics()
+
+        # Blocking ytmusicapi calls run here so they never stall the event loop
+        self.executor = UpstreamExecutor()
+        self.executor.listener = self.metrics.observe_upstream
+
+        # Rate limit, retry budget and circuit breaker in front of the pool
+        self.upstream = ResilientUpstream(self.executor)
+
+        # Memoized upstream responses, keyed by endpoint and normalized arguments
+        self.cache = ResponseCache()
+
+        # Playable stream info, cached until just before the URLs expire
+        self.streams = StreamResolver(self.cache, self.upstream, self.ytmusic)
+
+        # Upcoming queue items resolved in the background while upstream is idle
+        self.prefetcher = QueuePrefetcher(self.streams, self.upstream)
+
+        # Playlist windows sliced from one growing, cached track list per playlist
+        self.playlists = PlaylistWindows(self.cache, self.upstream, self.ytmusic)
+
+        # Artist screens: get_artist plus the full section lists, fetched in parallel under a deadline
+        self.artist_pages = ArtistPage(self.cache, self.upstream, self.ytmusic, self.playlists)
+
+        # Every track that passes through the cache is indexed for local type-ahead
+        self.search_index = LocalSearchIndex()
+        self.cache.subscribe(self.search_index.ingest)
+
+        # Search pages served from the local index or one growing, cached result list per query
+        self.searcher = SearchPager(self.cache, self.upstream, self.ytmusic, index=self.search_index)
+
+        # Thumbnails fetched once from i.ytimg.com and kept, with resized variants, on disk
+        self.thumbs = ThumbnailProxy()
+
+        # Liked songs and recently played, synced between a listener's devices
+        self.library = Library(self.cache, self.upstream, self.ytmusic)
+
+        # Home feed and categories, encoded once; each request only copies bytes or answers 304
+        snapshot = snapshot or load_snapshot()
+        self.home_sections = snapshot["sections"]
+        self.home_payload = PrecomputedPayload({"sections": self.home_sections})
+        self.categories_payload = PrecomputedPayload({"categories": snapshot["categories"]}, max_age=3600)
+        for section in self.home_sections:
+            self.search_index.add_many(section["items"])
+
+        # Encoded bodies of responses served many times over, such as chart snapshots
+        self.encoded = EncodedCache()
+
+        # Charts are refreshed off the request path; the home feed follows the first country
+        self.refresher = ChartRefresher(
+            self.upstream, self.ytmusic, self.home_payload, self.home_sections, cache=self.cache
+        )
+
+    def start(self):
+        self.refresher.start()
+
+    async def stop(self):
+        await self.refresher.stop()
+        await self.prefetcher.stop()
+        self.upstream.shutdown()
+        self.cache.backend.close()
+        self.library.store.close()
+
+
+def get_services(request: Request):
+    return request.app.state.services
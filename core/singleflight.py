@@ -0,0 +1,44 @@
+"""Coalesce identical in-flight upstream calls.
+
+When many clients ask for the same chart or song at once, only the first
+request starts an upstream call. The others wait on that call and receive
+the same result or the same exception.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """Share one in-flight awaitable per key among concurrent callers."""
+
+    def __init__(self):
+        self._flights = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._flights)
+
+    def __contains__(self, key):
+        return key in self._flights
+
+    async def do(self, key, loader):
+        """Await ``loader()`` once per ``key`` no matter how many callers wait on it."""
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._flights[key] = task
+            task.add_done_callback(lambda _task: self._forget(key, _task))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        # A caller that goes away (client disconnect) must not cancel the
+        # shared call for everybody else.
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,17 @@
+"""Static home feed and categories, stored as compact JSON.
+
+The content used to be a large Python literal in the entry point. Reading
+one small JSON file at import time is cheaper than building that literal.
+Edit ``core/data/snapshot.json``
+directly; it holds ``{"sections": [...], "categories": [...]}``.
+"""
+
+import json
+import os
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "snapshot.json")
+
+
+def load_snapshot(path=None):
+    with open(path or SNAPSHOT_PATH, "rb") as f:
+        return json.loads(f.read())
@@ -0,0 +1,120 @@
+"""Resolve playable stream info for a video and cache it until it expires.
+
+``ytmusic.get_song`` returns ``streamingData`` with the available formats
+and ``expiresInSeconds``. Those URLs are temporary, so each resolved result
+is cached until shortly before it expires. A hit close to expiry starts a
+background refresh so the player rarely waits on upstream.
+"""
+
+import asyncio
+import re
+import time
+
+from core import config
+from core.cache import make_key
+
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+class StreamError(Exception):
+    status_code = 500
+
+
+class InvalidVideoId(StreamError):
+    status_code = 400
+
+
+class StreamUnavailable(StreamError):
+    """The video exists upstream but has no playable stream."""
+
+    status_code = 404
+
+
+def validate_video_id(video_id):
+    if not VIDEO_ID_RE.match(video_id):
+        raise InvalidVideoId(f"Invalid video id: {video_id!r}")
+    return video_id
+
+
+def watch_url(video_id):
+    return f"https://music.youtube.com/watch?v={video_id}"
+
+
+def _format_info(fmt):
+    return {
+        "itag": fmt.get("itag"),
+        "mime_type": fmt.get("mimeType"),
+        "bitrate": fmt.get("bitrate"),
+        "audio_quality": fmt.get("audioQuality"),
+        "content_length": fmt.get("contentLength"),
+        "url": fmt.get("url"),
+    }
+
+
+def parse_stream_info(video_id, song, now=None):
+    """Build the ``/api/stream`` payload from a ``get_song`` response."""
+    now = time.time() if now is None else now
+
+    playability = song.get("playabilityStatus") or {}
+    status = playability.get("status", "OK")
+    if status != "OK":
+        raise StreamUnavailable(playability.get("reason") or f"Video is not playable ({status})")
+
+    streaming = song.get("streamingData") or {}
+    lifetime = float(streaming.get("expiresInSeconds") or config.STREAM_DEFAULT_LIFETIME)
+    formats = streaming.get("adaptiveFormats", []) + streaming.get("formats", [])
+    audio = [f for f in formats if (f.get("mimeType") or "").startswith("audio/")]
+    # Best audio first; formats with a direct URL win over ciphered ones
+    audio.sort(key=lambda f: (f.get("url") is not None, f.get("bitrate") or 0), reverse=True)
+
+    best = audio[0] if audio else None
+    return {
+        "stream_url": best.get("url") if best and best.get("url") else watch_url(video_id),
+        "video_id": video_id,
+        "expires_at": int(now + lifetime),
+        "format": _format_info(best) if best else None,
+        "formats": [_format_info(f) for f in audio],
+    }
+
+
+class StreamResolver:
+    """Resolve and cache stream info, refreshing entries before they expire."""
+
+    def __init__(self, cache, upstream, client, margin=None, refresh_window=None):
+        self.cache = cache
+        self.upstream = upstream
+        self.client = client
+        self.margin = config.STREAM_EXPIRY_MARGIN if margin is None else margin
+        self.refresh_window = (
+            config.STREAM_REFRESH_WINDOW if refresh_window is None else refresh_window
+        )
+        self._refreshing = set()
+
+    async def resolve(self, video_id):
+        validate_video_id(video_id)
+        key = make_key("stream", video_id)
+        info = await self.cache.get("stream", key)
+        if info is None:
+            return await self.cache.flights.do(key, lambda: self._fetch(video_id, key))
+
+        if info["expires_at"] - time.time() < self.refresh_window and key not in self.cache.flights:
+            task = asyncio.ensure_future(self._refresh(video_id, key))
+            self._refreshing.add(task)
+            task.add_done_callback(self._refreshing.discard)
+        return info
+
+    async def _refresh(self, video_id, key):
+        try:
+            await self.cache.flights.do(key, lambda: self._fetch(video_id, key))
+        except Exception:
+            # Keep serving the current entry; the next hit retries
+            pass
+
+    async def _fetch(self, video_id, key):
+        song = await self.upstream.run(self.client.get_song, video_id)
+        # The same response answers /api/song, so prime that cache as well
+        await self.cache.set("song", make_key("song", video_id), song)
+
+        info = parse_stream_info(video_id, song)
+        await self.cache.set("stream", key, info, ttl=info["expires_at"] - time.time() - self.margin)
+        return info
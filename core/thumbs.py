@@ -0,0 +1,310 @@
+"""Thumbnail proxy backed by a content-addressed disk cache.
+
+``/api/thumb/{video_id}`` fetches ``i.ytimg.com/vi/{id}/hqdefault.jpg``
+once. Each thumbnail is kept on disk, along with the resized variants
+clients ask for. A variant is WebP when the client accepts it, otherwise
+JPEG. Variants are only produced when the optional Pillow package is
+installed. Without it the original JPEG is served at every size.
+
+``ThumbnailStore`` names each blob by the SHA-256 of its content, so the
+many videos that share YouTube's placeholder image share one file. Small
+ref files map a variant key (``video id|width|format``) to the blob. The
+digest doubles as the ETag. Blobs are trimmed oldest-first once the
+directory grows past its size limit. Reads refresh a blob's mtime, so the
+trimming works like an LRU. The running total only counts this process's
+writes, so a trim rescans the directory: when the total goes past the
+limit, and at least every ``TRIM_INTERVAL`` seconds of writes to notice
+other workers sharing it.
+
+Because a variant URL always maps to the same image, responses are sent
+``immutable`` with a one-year ``max-age``.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from core import config
+from core.singleflight import SingleFlight
+from core.stream import validate_video_id
+
+logger = logging.getLogger(__name__)
+
+SOURCE_URL = "https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+# Requested widths are rounded up to one of these so each thumbnail has few variants;
+# anything wider than the 480px source is served as the original
+WIDTHS = (60, 120, 226, 360)
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+class ThumbnailError(Exception):
+    status_code = 502
+
+
+class ThumbnailNotFound(ThumbnailError):
+    status_code = 404
+
+
+def snap_width(width):
+    """Round a requested width up to a variant width; ``None`` means the original."""
+    if width is None:
+        return None
+    for candidate in WIDTHS:
+        if width <= candidate:
+            return candidate
+    return None
+
+
+_pillow = None
+
+
+def pillow():
+    """The optional ``PIL.Image`` module, or ``None``; imported on first use."""
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image
+        except ImportError:
+            Image = False
+        _pillow = Image
+    return _pillow or None
+
+
+def resize(body, width, fmt):
+    """Scale JPEG bytes down to ``width`` and encode them as ``fmt``."""
+    Image = pillow()
+    with Image.open(io.BytesIO(body)) as image:
+        image = image.convert("RGB")
+        if width is not None and image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        if fmt == "webp":
+            image.save(out, "WEBP", quality=80, method=4)
+        else:
+            image.save(out, "JPEG", quality=85, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+# ============== DISK STORE ==============
+
+class ThumbnailStore:
+    """Blobs named by their SHA-256 plus variant-key refs, trimmed to ``max_bytes``."""
+
+    # Longest time between rescans while this process keeps writing
+    TRIM_INTERVAL = 300.0
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or config.THUMB_CACHE_DIR
+        self.max_bytes = config.THUMB_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._blobs = os.path.join(self.directory, "blobs")
+        self._refs = os.path.join(self.directory, "refs")
+        self._lock = threading.Lock()
+        # Unknown until the first write rescans the directory
+        self._bytes = None
+        self._trimmed_at = 0.0
+        self.evictions = 0
+
+    def _blob_path(self, digest):
+        return os.path.join(self._blobs, digest[:2], digest)
+
+    def _ref_path(self, key):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._refs, name[:2], name)
+
+    @staticmethod
+    def _write(path, data):
+        # Write-then-rename, so other workers never read a half-written file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def get(self, key):
+        """Return ``(body, content_type, digest)`` for ``key``, or ``None``."""
+        ref = self._ref_path(key)
+        try:
+            with open(ref, "rb") as f:
+                digest, _, content_type = f.read().decode("ascii").partition(" ")
+            path = self._blob_path(digest)
+            with open(path, "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError):
+            logger.warning("Unreadable thumbnail cache entry for %s", key, exc_info=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return body, content_type, digest
+
+    def put(self, key, body, content_type):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                self._write(path, body)
+                if self._bytes is not None:
+                    self._bytes += len(body)
+            self._write(self._ref_path(key), f"{digest} {content_type}".encode("ascii"))
+            now = time.monotonic()
+            if (self._bytes is None or self._bytes > self.max_bytes
+                    or now - self._trimmed_at >= self.TRIM_INTERVAL):
+                self._trim(now)
+        return digest
+
+    def _scan(self):
+        blobs = []
+        for root, _, files in os.walk(self._blobs):
+            for name in files:
+                if name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                blobs.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        return blobs
+
+    def size_bytes(self):
+        """Size found by the last rescan plus this process's writes since; ``None`` before the first."""
+        return self._bytes
+
+    def _trim(self, now):
+        # Rescan rather than trust the running total: other workers write here too
+        blobs = sorted(self._scan())
+        total = sum(size for _, size, _ in blobs)
+        self._bytes = total
+        self._trimmed_at = now
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for _, size, path in blobs:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+        # Refs to removed blobs read as misses; drop them too
+        for root, _, files in os.walk(self._refs):
+            for name in files:
+                ref = os.path.join(root, name)
+                try:
+                    with open(ref, "rb") as f:
+                        digest = f.read().decode("ascii").partition(" ")[0]
+                    if not os.path.exists(self._blob_path(digest)):
+                        os.unlink(ref)
+                except (OSError, UnicodeDecodeError):
+                    continue
+
+    def info(self):
+        return {"directory": self.directory, "bytes": self.size_bytes(), "evictions": self.evictions}
+
+
+# ============== PROXY ==============
+
+class ThumbnailProxy:
+    """Fetch, cache and resize YouTube thumbnails."""
+
+    def __init__(self, store=None, fetcher=None, timeout=None):
+        self.store = store or ThumbnailStore()
+        # fetcher(url) -> bytes, or None when upstream has no such image
+        self.fetcher = fetcher or self._fetch
+        self.timeout = config.THUMB_FETCH_TIMEOUT if timeout is None else timeout
+        self._flights = SingleFlight()
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+
+    def _fetch(self, url):
+        # requests is only needed once a thumbnail misses the disk cache
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+        response = self._session.get(url, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content
+
+    def _original(self, video_id):
+        key = f"{video_id}|orig"
+        cached = self.store.get(key)
+        if cached is not None:
+            return cached
+        self.fetches += 1
+        try:
+            body = self.fetcher(SOURCE_URL.format(video_id=video_id))
+        except Exception as e:
+            logger.warning("Thumbnail fetch for %s failed: %s", video_id, e)
+            raise ThumbnailError(f"Could not fetch thumbnail for {video_id}") from e
+        if body is None:
+            raise ThumbnailNotFound(f"No thumbnail for {video_id}")
+        digest = self.store.put(key, body, CONTENT_TYPES["jpeg"])
+        return body, CONTENT_TYPES["jpeg"], digest
+
+    def _load(self, video_id, width, fmt):
+        """Blocking: the original from disk or upstream, then the variant."""
+        original = self._original(video_id)
+        if fmt is None:
+            return original
+        key = f"{video_id}|{width or 'orig'}|{fmt}"
+        cached = self.store.get(key)
+        if cached is not None:
+            return cached
+        try:
+            body = resize(original[0], width, fmt)
+        except Exception:
+            logger.warning("Could not resize thumbnail for %s", video_id, exc_info=True)
+            return original
+        content_type = CONTENT_TYPES[fmt]
+        return body, content_type, self.store.put(key, body, content_type)
+
+    async def get(self, video_id, width=None, webp=False):
+        """Return ``(body, content_type, digest)`` for a thumbnail variant."""
+        validate_video_id(video_id)
+        width = snap_width(width)
+        # Without Pillow every size and format is the original JPEG
+        fmt = None
+        if pillow() is not None and (width is not None or webp):
+            fmt = "webp" if webp else "jpeg"
+        key = f"{video_id}|{width or 'orig'}|{fmt}" if fmt else f"{video_id}|orig"
+
+        cached = await asyncio.to_thread(self.store.get, key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        return await self._flights.do(key, lambda: asyncio.to_thread(self._load, video_id, width, fmt))
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "evictions": self.store.evictions,
+            "bytes": self.store.size_bytes(),
+        }
@@ -0,0 +1,111 @@
+"""Run blocking ytmusicapi calls on a bounded thread pool.
+
+The ``YTMusic`` client is synchronous. Calling it straight from an
+``async def`` handler blocks the event loop, so every other request waits
+behind one slow upstream call. ``UpstreamExecutor`` sends those calls to a
+dedicated pool instead. It caps the number of waiting calls and applies a
+per-call timeout.
+
+When ``listener`` is set, it is called from the worker thread after each
+call as ``listener(method, seconds, error)``. ``error`` is the exception
+class name, or ``None`` on success.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import config
+
+
+class UpstreamError(Exception):
+    """Base class for failures of the execution layer itself (not of YouTube Music)."""
+
+    status_code = 502
+
+
+class UpstreamOverloaded(UpstreamError):
+    """Raised when too many calls are already running or queued."""
+
+    status_code = 503
+
+
+class UpstreamTimeout(UpstreamError):
+    """Raised when an upstream call does not finish within its timeout."""
+
+    status_code = 504
+
+
+class UpstreamExecutor:
+    """Bounded thread pool with load shedding for blocking upstream calls."""
+
+    def __init__(self, max_workers=None, max_queue=None, timeout=None):
+        self.max_workers = max_workers or config.UPSTREAM_MAX_WORKERS
+        self.max_queue = config.UPSTREAM_MAX_QUEUE if max_queue is None else max_queue
+        self.timeout = timeout or config.UPSTREAM_TIMEOUT
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="ytmusic"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.listener = None
+
+    @property
+    def pending(self):
+        """Calls currently running or waiting for a worker thread."""
+        return self._pending
+
+    @property
+    def queue_depth(self):
+        """Calls waiting for a worker thread."""
+        return max(0, self._pending - self.max_workers)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, fn, args, kwargs):
+        listener = self.listener
+        if listener is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        error = None
+        try:
+            return fn(*args, **kwargs)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            listener(getattr(fn, "__name__", "call"), time.perf_counter() - start, error)
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """Run ``fn(*args, **kwargs)`` in the pool and await its result."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise UpstreamOverloaded("Upstream is overloaded, try again later")
+            self._pending += 1
+
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except RuntimeError:
+            # Pool already shut down
+            self._release(None)
+            raise UpstreamOverloaded("Upstream executor is shut down")
+        # The slot is freed only when the thread is done, so calls that timed
+        # out but are still running keep counting against the limit.
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise UpstreamTimeout(f"Upstream call {getattr(fn, '__name__', fn)} timed out")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,148 @@
+"""Response encoding: JSON, or MessagePack when the client asks for it.
+
+Clients that send ``Accept: application/msgpack`` get MessagePack bodies.
+They are smaller than JSON and quicker to decode on slow phones. Everyone
+else, and every deployment without the optional ``msgpack`` package,
+gets JSON. ``WireFormatMiddleware`` reads the ``Accept`` header once per
+request. ``ApiResponse``, the app's default response class, then encodes
+whatever a route returns in that format.
+
+Long-lived response objects (chart snapshots) are encoded once per format
+and kept in an ``EncodedCache``. Error responses and NDJSON streams stay
+JSON.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+MEDIA_TYPES = {JSON: "application/json", MSGPACK: "application/msgpack"}
+_MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Format negotiated for the request being handled; set by WireFormatMiddleware
+response_format = ContextVar("response_format", default=JSON)
+
+
+def encode_json(data):
+    # Compact UTF-8 JSON, the same bytes FastAPI's JSON responses produce
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode(data, fmt=JSON):
+    if fmt == MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    return encode_json(data)
+
+
+def negotiate(accept):
+    """``MSGPACK`` when ``accept`` prefers it over JSON and msgpack is installed, else ``JSON``."""
+    if msgpack is None or not accept:
+        return JSON
+    best = {JSON: 0.0, MSGPACK: 0.0}
+    for part in accept.lower().split(","):
+        media_type, *params = part.split(";")
+        media_type = media_type.strip()
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in _MSGPACK_TYPES:
+            best[MSGPACK] = max(best[MSGPACK], q)
+        elif media_type in ("application/json", "application/*", "*/*"):
+            best[JSON] = max(best[JSON], q)
+    return MSGPACK if best[MSGPACK] > 0 and best[MSGPACK] >= best[JSON] else JSON
+
+
+class EncodedCache:
+    """Encoded bodies of response objects that are returned many times, by identity.
+
+    An entry keeps its object alive, so its ``id`` cannot be reused while
+    the entry exists. A replaced object (a refreshed chart) simply misses
+    and the old entry ages out.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, data, fmt):
+        key = (id(data), fmt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is data:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        body = encode(data, fmt)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (data, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class ApiResponse(JSONResponse):
+    """JSON or MessagePack, whichever was negotiated for the current request.
+
+    With ``cache``, the encoded body is looked up in (and added to) that
+    ``EncodedCache`` instead of being encoded again.
+    """
+
+    def __init__(self, content, status_code=200, headers=None, media_type=None, background=None, cache=None):
+        self.format = response_format.get()
+        self._cache = cache
+        super().__init__(content, status_code, headers, media_type or MEDIA_TYPES[self.format], background)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content):
+        if self._cache is not None:
+            return self._cache.encode(content, self.format)
+        return encode(content, self.format)
+
+
+class WireFormatMiddleware:
+    """ASGI middleware negotiating the response format of API requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        token = response_format.set(negotiate(Headers(scope=scope).get("accept")))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            response_format.reset(token)
@@ -1,6 +1,106 @@
 // ===== Web Music Player Application =====
 const API_BASE_URL = window.location.hostname === 'localhost' ? 'http://localhost:8000/api' : '/api';
 
+// YouTube video thumbnails are loaded through /api/thumb, which caches them and resizes them
+const YT_THUMB_RE = /^https?:\/\/i\d?\.ytimg\.com\/vi(?:_webp)?\/([A-Za-z0-9_-]{11})\//;
+
+function thumbSrc(url, size = 'medium') {
+    const match = YT_THUMB_RE.exec(url || '');
+    return match ? `${API_BASE_URL}/thumb/${match[1]}?thumb=${size}` : url;
+}
+
+// ===== API Responses =====
+// The server answers in MessagePack when asked: smaller, and quicker to decode than JSON
+const API_ACCEPT = 'application/msgpack, application/json;q=0.9';
+
+function apiFetch(path, options = {}) {
+    return fetch(`${API_BASE_URL}${path}`, {
+        ...options,
+        headers: { Accept: API_ACCEPT, ...(options.headers || {}) }
+    });
+}
+
+async function readApiResponse(response) {
+    const type = response.headers.get('Content-Type') || '';
+    if (type.startsWith('application/msgpack')) {
+        return decodeMsgpack(new Uint8Array(await response.arrayBuffer()));
+    }
+    return response.json();
+}
+
+// Decodes the MessagePack subset the API produces (no extension types)
+function decodeMsgpack(bytes) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const text = new TextDecoder();
+    let pos = 0;
+
+    const num = (getter, size) => {
+        const value = view[getter](pos);
+        pos += size;
+        return value;
+    };
+    const str = (length) => text.decode(bytes.subarray(pos, pos += length));
+    const bin = (length) => bytes.slice(pos, pos += length);
+    const arr = (length) => {
+        const items = new Array(length);
+        for (let i = 0; i < length; i++) items[i] = read();
+        return items;
+    };
+    const map = (length) => {
+        const object = {};
+        for (let i = 0; i < length; i++) {
+            const key = read();
+            object[key] = read();
+        }
+        return object;
+    };
+
+    function read() {
+        const type = num('getUint8', 1);
+        if (type < 0x80) return type;
+        if (type < 0x90) return map(type & 0x0f);
+        if (type < 0xa0) return arr(type & 0x0f);
+        if (type < 0xc0) return str(type & 0x1f);
+        if (type >= 0xe0) return type - 0x100;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return bin(num('getUint8', 1));
+            case 0xc5: return bin(num('getUint16', 2));
+            case 0xc6: return bin(num('getUint32', 4));
+            case 0xca: return num('getFloat32', 4);
+            case 0xcb: return num('getFloat64', 8);
+            case 0xcc: return num('getUint8', 1);
+            case 0xcd: return num('getUint16', 2);
+            case 0xce: return num('getUint32', 4);
+            case 0xcf: return Number(num('getBigUint64', 8));
+            case 0xd0: return num('getInt8', 1);
+            case 0xd1: return num('getInt16', 2);
+            case 0xd2: return num('getInt32', 4);
+            case 0xd3: return Number(num('getBigInt64', 8));
+            case 0xd9: return str(num('getUint8', 1));
+            case 0xda: return str(num('getUint16', 2));
+            case 0xdb: return str(num('getUint32', 4));
+            case 0xdc: return arr(num('getUint16', 2));
+            case 0xdd: return arr(num('getUint32', 4));
+            case 0xde: return map(num('getUint16', 2));
+            case 0xdf: return map(num('getUint32', 4));
+        }
+        throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+    }
+
+    return read();
+}
+
+// Upcoming queue items the server warms up ahead of playback
+const PREFETCH_DEPTH = 3;
+
+// Library changes are batched for this long before they are synced
+const SYNC_DELAY = 2000;
+// Changes sent per sync request (LIBRARY_MAX_CHANGES on the server)
+const SYNC_MAX_CHANGES = 500;
+
 // ===== App State =====
 const state = {
     currentPage: 'home',
@@ -10,7 +110,8 @@ const state = {
     currentIndex: 0,
     likedSongs: [],
     recentlyPlayed: [],
-    homeData: null
+    homeData: null,
+    searchSeq: 0
 };
 
 // ===== DOM Elements =====
@@ -40,6 +141,9 @@ async function initApp() {
     // Load saved data
     await loadLikedSongs();
     await loadRecentlyPlayed();
+
+    await joinSharedLibrary();
+    syncLibrary();
     
     // Setup event listeners
     setupNavigation();
@@ -57,6 +161,26 @@ async function initApp() {
     setupPWA();
 }
 
+// A shared link (?library=...) offers to join another device's library.
+// The parameter is removed right away, so a reload or bookmark never applies it again.
+async function joinSharedLibrary() {
+    const params = new URLSearchParams(window.location.search);
+    const library = params.get('library');
+    if (!library) return;
+
+    params.delete('library');
+    const query = params.toString();
+    history.replaceState(history.state, '', window.location.pathname + (query ? `?${query}` : '') + window.location.hash);
+
+    const { library: current } = await musicDB.getSyncState();
+    if (library === current) return;
+    const ok = confirm('Gabungkan lagu yang disukai dan riwayat putar perangkat ini dengan library dari tautan ini?');
+    if (ok) {
+        await musicDB.setSyncLibrary(library);
+        showToast('Library tersambung');
+    }
+}
+
 // ===== Navigation =====
 function setupNavigation() {
     elements.navItems.forEach(item => {
@@ -127,8 +251,8 @@ async function loadHomeContent() {
     
     try {
         // Fetch from API
-        const response = await fetch(`${API_BASE_URL}/home`);
-        const data = await response.json();
+        const response = await apiFetch('/home');
+        const data = await readApiResponse(response);
         state.homeData = data;
         
         renderHomeSections(contentScroll, data.sections);
@@ -319,7 +443,7 @@ function renderHomeSections(container, sections) {
                 return `
                     <div class="artist-card" data-id="${item.id}" data-title="${item.title}">
                         <div class="artist-thumb">
-                            <img src="${item.thumbnail}" alt="${item.title}" loading="lazy">
+                            <img src="${thumbSrc(item.thumbnail)}" alt="${item.title}" loading="lazy">
                         </div>
                         <div class="artist-name">${item.title}</div>
                         <div class="artist-type">${item.type}</div>
@@ -330,7 +454,7 @@ function renderHomeSections(container, sections) {
             return `
                 <div class="music-card" data-id="${item.id}" data-title="${item.title}" data-artist="${item.artist}" data-thumbnail="${item.thumbnail}">
                     <div class="card-thumb">
-                        <img src="${item.thumbnail}" alt="${item.title}" loading="lazy">
+                        <img src="${thumbSrc(item.thumbnail)}" alt="${item.title}" loading="lazy">
                         <div class="card-overlay">
                             <div class="play-icon">
                                 <svg width="24" height="24" viewBox="0 0 24 24" fill="currentColor">
@@ -359,16 +483,11 @@ function renderHomeSections(container, sections) {
         `;
     }).join('');
     
-    // Add click handlers
+    // Add click handlers; the rest of the card's section becomes the queue
     container.querySelectorAll('.music-card').forEach(card => {
         card.addEventListener('click', () => {
-            const song = {
-                id: card.dataset.id,
-                title: card.dataset.title,
-                artist: card.dataset.artist,
-                thumbnail: card.dataset.thumbnail
-            };
-            playSong(song);
+            const cards = [...card.closest('.section').querySelectorAll('.music-card')];
+            playFromList(cards.map(songFromDataset), cards.indexOf(card));
         });
     });
 }
@@ -377,8 +496,8 @@ function renderHomeSections(container, sections) {
 async function loadCategories() {
     try {
         // Fetch from API
-        const response = await fetch(`${API_BASE_URL}/categories`);
-        const data = await response.json();
+        const response = await apiFetch('/categories');
+        const data = await readApiResponse(response);
         const categories = data.categories || [];
         
         elements.categoryGrid.innerHTML = categories.map(cat => `
@@ -419,6 +538,7 @@ function setupSearch() {
         const query = e.target.value.trim();
         
         if (query.length === 0) {
+            state.searchSeq++;
             elements.searchResults.innerHTML = '';
             return;
         }
@@ -430,19 +550,58 @@ function setupSearch() {
 }
 
 async function performSearch(query) {
+    const searchId = ++state.searchSeq;
+    const results = [];
+    
     try {
-        // Fetch from API
-        const response = await fetch(`${API_BASE_URL}/search?query=${encodeURIComponent(query)}`);
-        const data = await response.json();
-        renderSearchResults(data.results || []);
+        // Stream results so the first ones render before the rest arrive
+        const response = await fetch(`${API_BASE_URL}/search/stream?query=${encodeURIComponent(query)}`);
+        if (!response.ok || !response.body) {
+            throw new Error(`Search failed: ${response.status}`);
+        }
+        
+        for await (const item of readNDJSON(response)) {
+            // A newer search has started; drop this one
+            if (searchId !== state.searchSeq) return;
+            if (item.error) throw new Error(item.error);
+            
+            results.push(item);
+            renderSearchResults(results);
+        }
+        
+        if (results.length === 0) {
+            renderSearchResults(results);
+        }
     } catch (error) {
         console.error('Search error:', error);
+        if (searchId !== state.searchSeq || results.length > 0) return;
         // Fallback to mock data
-        const results = getMockSearchResults(query);
-        renderSearchResults(results);
+        const mockResults = getMockSearchResults(query);
+        renderSearchResults(mockResults);
     }
 }
 
+async function* readNDJSON(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        
+        for (const line of lines) {
+            if (line.trim()) yield JSON.parse(line);
+        }
+    }
+    
+    if (buffer.trim()) yield JSON.parse(buffer);
+}
+
 function getMockSearchResults(query) {
     const allSongs = [];
     state.homeData?.sections.forEach(section => {
@@ -465,7 +624,7 @@ function renderSearchResults(results) {
     
     elements.searchResults.innerHTML = results.map(song => `
         <div class="search-result-item" data-id="${song.id}" data-title="${song.title}" data-artist="${song.artist || ''}" data-thumbnail="${song.thumbnail}">
-            <img src="${song.thumbnail}" alt="${song.title}">
+            <img src="${thumbSrc(song.thumbnail, 'small')}" alt="${song.title}">
             <div class="search-result-info">
                 <h4>${song.title}</h4>
                 <p>${song.artist || 'Artis'}</p>
@@ -473,16 +632,11 @@ function renderSearchResults(results) {
         </div>
     `).join('');
     
-    // Add click handlers
-    elements.searchResults.querySelectorAll('.search-result-item').forEach(item => {
+    // Add click handlers; the search results become the queue
+    const items = [...elements.searchResults.querySelectorAll('.search-result-item')];
+    items.forEach((item, index) => {
         item.addEventListener('click', () => {
-            const song = {
-                id: item.dataset.id,
-                title: item.dataset.title,
-                artist: item.dataset.artist,
-                thumbnail: item.dataset.thumbnail
-            };
-            playSong(song);
+            playFromList(items.map(songFromDataset), index);
         });
     });
 }
@@ -513,6 +667,39 @@ function setupPlayer() {
     elements.audioPlayer.addEventListener('loadedmetadata', updateDuration);
 }
 
+function songFromDataset(el) {
+    return {
+        id: el.dataset.id,
+        title: el.dataset.title,
+        artist: el.dataset.artist,
+        thumbnail: el.dataset.thumbnail
+    };
+}
+
+// ===== Queue =====
+function playFromList(songs, index) {
+    state.queue = songs;
+    state.currentIndex = index;
+    playSong(songs[index]);
+    prefetchQueue();
+}
+
+// Ask the server to warm stream and song lookups for the next tracks, so
+// moving on does not wait for YouTube Music
+function prefetchQueue() {
+    const upcoming = [];
+    for (let i = 1; i < state.queue.length && upcoming.length < PREFETCH_DEPTH; i++) {
+        upcoming.push(state.queue[(state.currentIndex + i) % state.queue.length].id);
+    }
+    if (upcoming.length === 0) return;
+
+    fetch(`${API_BASE_URL}/prefetch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ids: upcoming })
+    }).catch(() => {});
+}
+
 async function playSong(song) {
     state.currentSong = song;
     state.isPlaying = true;
@@ -528,6 +715,7 @@ async function playSong(song) {
     
     // Update recently played list
     await loadRecentlyPlayed();
+    scheduleSync();
     
     // Simulate playing (in real app, set audio source)
     // elements.audioPlayer.src = song.streamUrl;
@@ -542,12 +730,12 @@ function updatePlayerUI() {
     const { title, artist, thumbnail } = state.currentSong;
     
     // Mini player
-    document.getElementById('player-thumb').src = thumbnail;
+    document.getElementById('player-thumb').src = thumbSrc(thumbnail, 'small');
     document.getElementById('player-title').textContent = title;
     document.getElementById('player-artist').textContent = artist;
     
     // Full player
-    document.getElementById('full-album-art').src = thumbnail;
+    document.getElementById('full-album-art').src = thumbSrc(thumbnail, 'max');
     document.getElementById('full-title').textContent = title;
     document.getElementById('full-artist').textContent = artist;
     
@@ -586,6 +774,7 @@ function playPrevious() {
     
     state.currentIndex = (state.currentIndex - 1 + state.queue.length) % state.queue.length;
     playSong(state.queue[state.currentIndex]);
+    prefetchQueue();
 }
 
 function playNext() {
@@ -593,6 +782,7 @@ function playNext() {
     
     state.currentIndex = (state.currentIndex + 1) % state.queue.length;
     playSong(state.queue[state.currentIndex]);
+    prefetchQueue();
 }
 
 function openFullPlayer() {
@@ -653,6 +843,7 @@ async function toggleLike(song) {
         }
         
         await loadLikedSongs();
+        scheduleSync();
     } catch (error) {
         console.error('Error toggling like:', error);
     }
@@ -667,6 +858,60 @@ async function loadRecentlyPlayed() {
     }
 }
 
+// ===== Library Sync =====
+let syncTimer = null;
+let syncRunning = null;
+
+function scheduleSync() {
+    clearTimeout(syncTimer);
+    syncTimer = setTimeout(syncLibrary, SYNC_DELAY);
+}
+
+// Push local changes and pull other devices' changes until both are up to date
+async function syncLibrary() {
+    if (syncRunning) return syncRunning;
+    syncRunning = (async () => {
+        try {
+            const { library, device } = await musicDB.getSyncState();
+            let paging = false;
+            let applied = 0;
+            for (let round = 0; round < 20; round++) {
+                const version = await musicDB.getPreference('syncVersion');
+                // While the server is still paging its changes, only pull
+                const changes = paging ? [] : (await musicDB.getOutbox()).slice(0, SYNC_MAX_CHANGES);
+                const sent = new Map(changes.map(change => [change.key, change.at]));
+
+                const response = await apiFetch('/library/sync', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        library,
+                        device,
+                        since: version,
+                        changes: changes.map(({ key, ...change }) => change)
+                    })
+                });
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                const data = await readApiResponse(response);
+                applied += await musicDB.applySync(data, sent);
+
+                // Done once all pages are in and nothing is left to push (a reset queues local entries)
+                paging = data.more;
+                if (!paging && (await musicDB.getOutbox()).length === 0) break;
+            }
+            if (applied > 0) {
+                await loadLikedSongs();
+                await loadRecentlyPlayed();
+            }
+        } catch (error) {
+            console.log('Library sync failed:', error);
+        } finally {
+            syncRunning = null;
+        }
+    })();
+    return syncRunning;
+}
+
 // ===== Toast =====
 function showToast(message) {
     elements.toast.textContent = message;
@@ -1,6 +1,22 @@
 // ===== IndexedDB Database Manager =====
 const DB_NAME = 'WebMusicDB';
-const DB_VERSION = 1;
+const DB_VERSION = 2;
+
+// Track fields kept in the sync outbox and sent to /api/library/sync
+const SYNC_TRACK_FIELDS = ['id', 'title', 'artist', 'thumbnail', 'duration'];
+
+function compactTrack(song) {
+    const track = {};
+    for (const field of SYNC_TRACK_FIELDS) {
+        track[field] = song[field] ?? null;
+    }
+    return track;
+}
+
+function randomId() {
+    if (window.crypto?.randomUUID) return crypto.randomUUID();
+    return Date.now().toString(36) + Math.random().toString(36).slice(2) + Math.random().toString(36).slice(2);
+}
 
 class MusicDatabase {
     constructor() {
@@ -57,6 +73,11 @@ class MusicDatabase {
                 if (!db.objectStoreNames.contains('preferences')) {
                     db.createObjectStore('preferences', { keyPath: 'key' });
                 }
+
+                // Library changes not yet sent to the server, one per collection and song
+                if (!db.objectStoreNames.contains('syncOutbox')) {
+                    db.createObjectStore('syncOutbox', { keyPath: 'key' });
+                }
             };
         });
     }
@@ -64,29 +85,33 @@ class MusicDatabase {
     // ===== Liked Songs Methods =====
     async addLikedSong(song) {
         return new Promise((resolve, reject) => {
-            const transaction = this.db.transaction(['likedSongs'], 'readwrite');
+            const transaction = this.db.transaction(['likedSongs', 'syncOutbox'], 'readwrite');
             const store = transaction.objectStore('likedSongs');
+            const at = Date.now();
             
             const songData = {
                 ...song,
-                addedAt: new Date().toISOString()
+                addedAt: new Date(at).toISOString()
             };
 
-            const request = store.put(songData);
+            store.put(songData);
+            this.recordChange(transaction, 'liked', song.id, 'put', at, song);
 
-            request.onsuccess = () => resolve(songData);
-            request.onerror = () => reject(request.error);
+            transaction.oncomplete = () => resolve(songData);
+            transaction.onerror = () => reject(transaction.error);
         });
     }
 
     async removeLikedSong(songId) {
         return new Promise((resolve, reject) => {
-            const transaction = this.db.transaction(['likedSongs'], 'readwrite');
+            const transaction = this.db.transaction(['likedSongs', 'syncOutbox'], 'readwrite');
             const store = transaction.objectStore('likedSongs');
-            const request = store.delete(songId);
 
-            request.onsuccess = () => resolve(true);
-            request.onerror = () => reject(request.error);
+            store.delete(songId);
+            this.recordChange(transaction, 'liked', songId, 'delete', Date.now());
+
+            transaction.oncomplete = () => resolve(true);
+            transaction.onerror = () => reject(transaction.error);
         });
     }
 
@@ -115,22 +140,24 @@ class MusicDatabase {
     // ===== Recently Played Methods =====
     async addToRecentlyPlayed(song) {
         return new Promise((resolve, reject) => {
-            const transaction = this.db.transaction(['recentlyPlayed'], 'readwrite');
+            const transaction = this.db.transaction(['recentlyPlayed', 'syncOutbox'], 'readwrite');
             const store = transaction.objectStore('recentlyPlayed');
+            const at = Date.now();
             
             const songData = {
                 ...song,
-                playedAt: new Date().toISOString()
+                playedAt: new Date(at).toISOString()
             };
 
-            const request = store.put(songData);
+            store.put(songData);
+            this.recordChange(transaction, 'recent', song.id, 'put', at, song);
 
-            request.onsuccess = () => {
-                // Keep only last 50 songs
+            transaction.oncomplete = () => {
+                // Keep only last 50 songs (the server trims its copy the same way)
                 this.trimRecentlyPlayed(50);
                 resolve(songData);
             };
-            request.onerror = () => reject(request.error);
+            transaction.onerror = () => reject(transaction.error);
         });
     }
 
@@ -308,6 +335,132 @@ class MusicDatabase {
         });
     }
 
+    // ===== Library Sync =====
+    // Runs inside the caller's transaction, so a change and its outbox entry are written together
+    recordChange(transaction, collection, id, op, at, song = null) {
+        transaction.objectStore('syncOutbox').put({
+            key: `${collection}:${id}`,
+            collection,
+            id,
+            op,
+            at,
+            track: song ? compactTrack(song) : null
+        });
+    }
+
+    async getSyncState() {
+        let library = await this.getPreference('syncLibrary');
+        let device = await this.getPreference('syncDevice');
+        if (!library) {
+            library = randomId();
+            await this.setPreference('syncLibrary', library);
+        }
+        if (!device) {
+            device = randomId();
+            await this.setPreference('syncDevice', device);
+        }
+        const version = await this.getPreference('syncVersion');
+        return { library, device, version };
+    }
+
+    // Join another device's library; the next sync starts from its full state
+    async setSyncLibrary(library) {
+        await this.setPreference('syncLibrary', library);
+        await this.setPreference('syncVersion', null);
+    }
+
+    async getOutbox() {
+        return new Promise((resolve, reject) => {
+            const transaction = this.db.transaction(['syncOutbox'], 'readonly');
+            const request = transaction.objectStore('syncOutbox').getAll();
+
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    // Apply one /api/library/sync response in a single transaction.
+    // `sent` maps the outbox keys included in the request to their `at`.
+    async applySync(response, sent = new Map()) {
+        return new Promise((resolve, reject) => {
+            const transaction = this.db.transaction(
+                ['likedSongs', 'recentlyPlayed', 'syncOutbox', 'preferences'], 'readwrite'
+            );
+            const stores = {
+                liked: transaction.objectStore('likedSongs'),
+                recent: transaction.objectStore('recentlyPlayed')
+            };
+            const outbox = transaction.objectStore('syncOutbox');
+            let applied = 0;
+
+            const outboxRequest = outbox.getAll();
+            const localRequests = response.reset ? [stores.liked.getAll(), stores.recent.getAll()] : [];
+            // Requests of one transaction complete in order; the last one sees all results
+            const last = localRequests.length ? localRequests[localRequests.length - 1] : outboxRequest;
+
+            last.onsuccess = () => {
+                const pending = new Map(outboxRequest.result.map(entry => [entry.key, entry]));
+
+                // The server has these now, unless they changed again while the request was out
+                for (const [key, at] of sent) {
+                    if (pending.get(key)?.at === at) {
+                        outbox.delete(key);
+                        pending.delete(key);
+                    }
+                }
+
+                // The server lost or no longer knows this library: offer it everything we have
+                if (response.reset) {
+                    const [liked, recent] = localRequests.map(request => request.result);
+                    const local = [
+                        ...liked.map(song => ['liked', song, song.addedAt]),
+                        ...recent.map(song => ['recent', song, song.playedAt])
+                    ];
+                    for (const [collection, song, time] of local) {
+                        const key = `${collection}:${song.id}`;
+                        if (pending.has(key)) continue;
+                        const entry = {
+                            key, collection, id: song.id, op: 'put',
+                            at: Date.parse(time) || 0, track: compactTrack(song)
+                        };
+                        outbox.put(entry);
+                        pending.set(key, entry);
+                    }
+                }
+
+                for (const change of response.changes) {
+                    const key = `${change.collection}:${change.id}`;
+                    const local = pending.get(key);
+                    // A newer local change wins; it is sent with the next sync
+                    if (local && local.at > change.at) continue;
+                    if (local) {
+                        outbox.delete(key);
+                        pending.delete(key);
+                    }
+
+                    const store = stores[change.collection];
+                    if (!store) continue;
+                    if (change.op === 'delete') {
+                        store.delete(change.id);
+                    } else {
+                        const time = new Date(change.at).toISOString();
+                        store.put({
+                            ...change.track,
+                            id: change.id,
+                            [change.collection === 'liked' ? 'addedAt' : 'playedAt']: time
+                        });
+                    }
+                    applied++;
+                }
+
+                transaction.objectStore('preferences').put({ key: 'syncVersion', value: response.version });
+            };
+
+            transaction.oncomplete = () => resolve(applied);
+            transaction.onerror = () => reject(transaction.error);
+        });
+    }
+
     // ===== Statistics =====
     async getStats() {
         const [likedSongs, recentlyPlayed, playlists] = await Promise.all([
@@ -1,5 +1,12 @@
 // ===== Service Worker for Web Music PWA =====
-const CACHE_NAME = 'web-music-v2.3.0';
+const APP_VERSION = '2.3.0';
+const CACHE_NAME = `web-music-v${APP_VERSION}`;
+// API responses live in their own cache, dropped with every new app version
+// and whenever the server's X-Cache-Version changes
+const API_CACHE_NAME = `web-music-api-v${APP_VERSION}`;
+const API_CACHE_MAX_ENTRIES = 200;
+const VERSION_HEADER = 'X-Cache-Version';
+const FETCHED_AT_HEADER = 'X-SW-Fetched-At';
 const STATIC_ASSETS = [
     '/',
     '/index.html',
@@ -32,7 +39,7 @@ self.addEventListener('activate', (event) => {
         caches.keys().then((cacheNames) => {
             return Promise.all(
                 cacheNames
-                    .filter((name) => name !== CACHE_NAME)
+                    .filter((name) => name !== CACHE_NAME && name !== API_CACHE_NAME)
                     .map((name) => caches.delete(name))
             );
         })
@@ -49,8 +56,9 @@ self.addEventListener('fetch', (event) => {
         return;
     }
     
-    // Skip API requests
+    // API requests follow the Cache-Control policy the server sends
     if (event.request.url.includes('/api/')) {
+        event.respondWith(handleApiRequest(event));
         return;
     }
     
@@ -100,6 +108,98 @@ self.addEventListener('fetch', (event) => {
     );
 });
 
+// ===== API caching (stale-while-revalidate) =====
+// Latest X-Cache-Version seen from the server
+let apiVersion = null;
+
+function parseCacheControl(header) {
+    const policy = { noStore: false, immutable: false, maxAge: 0, staleWhileRevalidate: 0 };
+    (header || '').split(',').forEach((part) => {
+        const [name, value] = part.trim().toLowerCase().split('=');
+        if (name === 'no-store') policy.noStore = true;
+        if (name === 'immutable') policy.immutable = true;
+        if (name === 'max-age') policy.maxAge = parseInt(value, 10) || 0;
+        if (name === 'stale-while-revalidate') policy.staleWhileRevalidate = parseInt(value, 10) || 0;
+    });
+    return policy;
+}
+
+function isCacheable(response) {
+    if (!response.ok || !response.headers.has(VERSION_HEADER)) return false;
+    const policy = parseCacheControl(response.headers.get('Cache-Control'));
+    // Immutable responses (thumbnails) are left to the browser's HTTP cache
+    return !policy.noStore && !policy.immutable && policy.maxAge > 0;
+}
+
+async function trimApiCache(cache) {
+    const keys = await cache.keys();
+    // Keys come back in insertion order, oldest first
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - API_CACHE_MAX_ENTRIES)).map((key) => cache.delete(key)));
+}
+
+async function storeApiResponse(request, response) {
+    const version = response.headers.get(VERSION_HEADER);
+    if (apiVersion !== null && version !== apiVersion) {
+        // The server's API changed: nothing cached so far may be reused
+        await caches.delete(API_CACHE_NAME);
+    }
+    apiVersion = version;
+
+    const headers = new Headers(response.headers);
+    headers.set(FETCHED_AT_HEADER, String(Date.now()));
+    const body = await response.blob();
+    const cache = await caches.open(API_CACHE_NAME);
+    await cache.put(request, new Response(body, { status: response.status, statusText: response.statusText, headers }));
+    await trimApiCache(cache);
+}
+
+async function fetchApi(event) {
+    const request = event.request;
+    const response = await fetch(request);
+    const version = response.headers.get(VERSION_HEADER);
+    if (isCacheable(response)) {
+        // Stored off the critical path, so streamed (NDJSON) bodies reach the page as they arrive
+        event.waitUntil(storeApiResponse(request, response.clone()).catch(() => {}));
+    } else if (version && apiVersion !== null && version !== apiVersion) {
+        await caches.delete(API_CACHE_NAME);
+        apiVersion = version;
+    }
+    return response;
+}
+
+async function handleApiRequest(event) {
+    const request = event.request;
+    const cache = await caches.open(API_CACHE_NAME);
+    let cached = await cache.match(request);
+    if (cached && apiVersion !== null && cached.headers.get(VERSION_HEADER) !== apiVersion) {
+        cached = undefined;
+    }
+
+    if (cached) {
+        const policy = parseCacheControl(cached.headers.get('Cache-Control'));
+        const age = (Date.now() - Number(cached.headers.get(FETCHED_AT_HEADER) || 0)) / 1000;
+        if (age < policy.maxAge) {
+            return cached;
+        }
+        if (age < policy.maxAge + policy.staleWhileRevalidate) {
+            // Serve the stale copy now and refresh it in the background
+            event.waitUntil(fetchApi(event).catch(() => {}));
+            return cached;
+        }
+    }
+
+    try {
+        return await fetchApi(event);
+    } catch (err) {
+        // Offline: an expired copy beats no answer
+        if (cached) return cached;
+        return new Response(JSON.stringify({ detail: 'Offline' }), {
+            status: 503,
+            headers: { 'Content-Type': 'application/json' }
+        });
+    }
+}
+
 // Background sync for offline actions
 self.addEventListener('sync', (event) => {
     if (event.tag === 'sync-liked-songs') {
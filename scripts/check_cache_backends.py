@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Cache backend check.
+
+Runs the same checks against every ``ResponseCache`` backend and fails
+(exit code 1) when one of them misbehaves. Redis is exercised through
+``FakeRedis``, a dict-backed stand-in for the redis-py client, so no
+server is needed.
+
+    python scripts/check_cache_backends.py
+"""
+
+import asyncio
+import fnmatch
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.cache import ResponseCache  # noqa: E402
+from core.cache_backends import MemoryBackend, RedisBackend, SQLiteBackend  # noqa: E402
+
+
+class FakeRedis:
+    """The part of the redis-py client ``RedisBackend`` uses, kept in a dict."""
+
+    def __init__(self):
+        # key -> (value, expires_at or None)
+        self.data = {}
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return None if entry is None else entry[0]
+
+    def set(self, key, value, px=None):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self.data[key] = (value, None if px is None else time.monotonic() + px / 1000)
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match=None):
+        for key in list(self.data):
+            if self._live(key) is not None and (match is None or fnmatch.fnmatchcase(key, match)):
+                yield key
+
+
+class BrokenClient:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("server unavailable")
+        return fail
+
+
+async def check(backend):
+    """Return the failed checks for ``backend``."""
+    failures = []
+    cache = ResponseCache(backend=backend, ttls={"song": 60, "short": 0.05}, stale_ttls={"short": 60})
+
+    value = {"title": "Lagu", "artists": [{"name": "Penyanyi"}], "duration": 215}
+    await cache.set("song", "song|abc", value)
+    if await cache.get("song", "song|abc") != value:
+        failures.append("stored value does not round-trip")
+    if await cache.get_many("song", ["song|abc", "song|missing"]) != [value, None]:
+        failures.append("get_many does not match get")
+
+    await cache.set("short", "short|x", "old")
+    await asyncio.sleep(0.1)
+    if await cache.get("short", "short|x") is not None:
+        failures.append("entry still fresh after its TTL")
+    if await cache.get_stale("short", "short|x") != "old":
+        failures.append("stale entry not kept for its stale TTL")
+
+    loaded = await cache.get_or_load("song", ("def",), lambda: asyncio.sleep(0, result="new"))
+    if loaded != "new" or await cache.get("song", "song|def") != "new":
+        failures.append("get_or_load does not store what it loaded")
+
+    await cache.clear()
+    if await cache.get("song", "song|abc") is not None:
+        failures.append("entry survives clear")
+    return failures
+
+
+async def main():
+    redis = FakeRedis()
+    redis.set("other-app:key", "keep")
+    backends = {
+        "memory": MemoryBackend(),
+        "sqlite": SQLiteBackend(path=os.path.join(tempfile.mkdtemp(), "cache.sqlite3")),
+        "redis": RedisBackend(client=redis),
+    }
+
+    failed = False
+    for name, backend in backends.items():
+        failures = await check(backend)
+        backend.close()
+        for failure in failures:
+            print(f"❌ {name}: {failure}")
+        failed = failed or bool(failures)
+
+    if redis.get("other-app:key") != b"keep":
+        print("❌ redis: clear removed keys outside its prefix")
+        failed = True
+
+    # A broken shared store degrades to misses, never to errors; its warnings are expected here
+    logging.getLogger("core.cache").setLevel(logging.ERROR)
+    cache = ResponseCache(backend=RedisBackend(client=BrokenClient()))
+    try:
+        await cache.set("song", "song|abc", "x")
+        if await cache.get("song", "song|abc") is not None:
+            print("❌ redis: unavailable server returned a value")
+            failed = True
+    except Exception as e:
+        print(f"❌ redis: unavailable server raised {e!r}")
+        failed = True
+
+    if not failed:
+        print(f"✅ Cache backends behave alike: {', '.join(backends)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
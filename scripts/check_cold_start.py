@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold start budget check for the Vercel handler.
+
+Imports api/index.py in fresh interpreters and fails (exit code 1) when
+the median import time of the app's own code is over budget, or when a
+module that is meant to load lazily (ytmusicapi, mangum) was imported at
+cold start.
+
+FastAPI and pydantic are imported and timed first, and are not counted.
+They cost the same with or without this app and take most of a cold start
+(about 600-850 ms on a slow CI box), so counting them would mostly measure
+the machine. The app's own import measured 70-110 ms when the budget was
+set; the 300 ms default leaves about 3x headroom. Override it with
+``--budget-ms`` or ``COLD_START_BUDGET_MS`` in CI.
+
+    python scripts/check_cold_start.py
+    python scripts/check_cold_start.py --budget-ms 200 --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported until the first request needs them
+DEFERRED_MODULES = ("ytmusicapi", "mangum", "requests")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import fastapi
+framework = time.perf_counter()
+import api.index
+end = time.perf_counter()
+print(json.dumps({
+    "framework_ms": (framework - start) * 1000,
+    "ms": (end - framework) * 1000,
+    "loaded": [name for name in %r if name in sys.modules],
+    "client_built": api.index.app.state.services.ytmusic.loaded,
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def measure():
+    # Keep the caller's PYTHONPATH; dependencies may be installed there
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    output = subprocess.check_output([sys.executable, "-c", PROBE], cwd=ROOT, env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("COLD_START_BUDGET_MS", 300)))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # The first run may compile bytecode; it is not counted
+    measure()
+    runs = [measure() for _ in range(max(1, args.runs))]
+    median = statistics.median(run["ms"] for run in runs)
+    framework = statistics.median(run["framework_ms"] for run in runs)
+    print(f"import fastapi: median {framework:.1f} ms (not counted)")
+    print(f"import api.index: median {median:.1f} ms over {len(runs)} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    if loaded:
+        print(f"❌ Imported at cold start: {', '.join(loaded)}")
+        failed = True
+    if any(run["client_built"] for run in runs):
+        print("❌ YTMusic client was built at cold start")
+        failed = True
+    if median > args.budget_ms:
+        print(f"❌ Over budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("✅ Cold start within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
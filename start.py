@@ -36,20 +36,15 @@ def start_backend():
     """Start FastAPI backend"""
     print("🚀 Starting backend server...")
     print("📍 Backend URL: http://localhost:8000")
-    print("📍 API Docs: http://localhost:8000/docs\n")
+    print("📍 API Docs: http://localhost:8000/docs")
+    print(f"📍 Profile: {os.environ.get('APP_PROFILE', 'development')}\n")
     
     try:
         # Change to backend directory
         os.chdir('backend')
         
-        # Start uvicorn
-        process = subprocess.Popen([
-            sys.executable, "-m", "uvicorn", 
-            "main:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000",
-            "--reload"
-        ])
+        # Start uvicorn; main.py picks reload/workers from APP_PROFILE
+        process = subprocess.Popen([sys.executable, "main.py"])
         
         return process
     except Exception as e:
@@ -71,6 +66,10 @@ def signal_handler(sig, frame):
 def main():
     print_banner()
     
+    # --production: multiple workers, no auto-reload, compressed responses
+    if "--production" in sys.argv[1:]:
+        os.environ["APP_PROFILE"] = "production"
+    
     # Setup signal handler
     signal.signal(signal.SIGINT, signal_handler)
     